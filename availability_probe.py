@@ -0,0 +1,161 @@
+"""Poll the calendar's own availability endpoint instead of reloading the page.
+
+The calendar SPA fetches availability as JSON once it mounts.  While
+navigate_to_calendar runs, Chrome's performance log (CDP Network events,
+enabled through goog:loggingPrefs) records that request; discover() picks the
+JSON response that looks like availability and keeps its URL as a template.
+An AvailabilityProbe then re-issues that request with an in-page fetch, so the
+browser's cookies and origin authenticate it, and the full UI is only
+reloaded and clicked once the probe reports a target date open.
+"""
+import json
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from calendar_scan import script_timeout
+
+LOGGING_PREFS = {"performance": "ALL"}
+# Network events only; page and timeline events are not needed and would bloat the log
+PERF_LOGGING_PREFS = {"enableNetwork": True, "enablePage": False}
+
+ENDPOINT_HINTS = ("availab", "calendar", "slot", "inventory", "capacity", "schedule")
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+# Payload keys (lower-cased, without '_' or '-') whose list holds open dates; 'unavailable' and the like don't match
+OPEN_DATE_KEYS = {"available", "availabledates", "availabledays", "availableslots", "open", "opendates", "opendays"}
+MONTH_VALUE = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+
+# arguments: url, callback; resolves to {status, body} or {status: null, error}
+FETCH_JS = """
+var url = arguments[0], done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include', cache: 'no-store', headers: {'Accept': 'application/json'}})
+    .then(function (response) {
+        return response.text().then(function (body) { done({status: response.status, body: body}); });
+    })
+    .catch(function (e) { done({status: null, error: String(e)}); });
+"""
+
+
+def enable_logging(options):
+    """Turn on the performance log that discover() reads; call before the browser is launched"""
+    options.set_capability("goog:loggingPrefs", LOGGING_PREFS)
+    options.add_experimental_option("perfLoggingPrefs", PERF_LOGGING_PREFS)
+    return options
+
+
+def drain(driver):
+    """Read and discard buffered performance log entries; returns them as CDP messages"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    messages = []
+    for entry in entries:
+        try:
+            messages.append(json.loads(entry["message"])["message"])
+        except (KeyError, ValueError):
+            continue
+    return messages
+
+
+def _score(url):
+    path = urlsplit(url).path.lower()
+    score = sum(hint in path for hint in ENDPOINT_HINTS) * 2
+    score += any(MONTH_VALUE.match(value) for _, value in parse_qsl(urlsplit(url).query))
+    return score
+
+
+def discover(driver, messages=None):
+    """URL of the JSON request that most looks like the calendar's availability feed, or None"""
+    messages = drain(driver) if messages is None else messages
+    candidates = []
+    for message in messages:
+        if message.get("method") != "Network.responseReceived":
+            continue
+        params = message.get("params", {})
+        response = params.get("response", {})
+        if params.get("type") not in ("XHR", "Fetch") or "json" not in response.get("mimeType", ""):
+            continue
+        if response.get("status") != 200:
+            continue
+        url = response.get("url", "")
+        score = _score(url)
+        if score:
+            candidates.append((score, url))
+    if not candidates:
+        return None
+    # Highest score wins; among equals the latest request reflects the mounted view
+    return max(enumerate(candidates), key=lambda item: (item[1][0], item[0]))[1][1]
+
+
+def month_url(template, month):
+    """template with every YYYY-MM (or YYYY-MM-DD) query value pointed at month ('YYYY-MM')"""
+    parts = urlsplit(template)
+    query = []
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        if MONTH_VALUE.match(value):
+            value = month if len(value) == 7 else f"{month}-01"
+        query.append((key, value))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def open_dates(payload):
+    """ISO dates an availability payload reports open.
+
+    Understands {"available": ["2026-11-15", ...]} (or "availableDates",
+    "openDates" and the like in OPEN_DATE_KEYS) and lists of records like
+    {"date": "2026-11-15", "available": true} (or a positive count), at any
+    nesting level.  Lists of sold-out dates ("unavailable", ...) are ignored.
+    """
+    found = set()
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key.lower().replace("_", "").replace("-", "") in OPEN_DATE_KEYS and isinstance(value, list):
+                    found.update(item[:10] for item in value if isinstance(item, str) and ISO_DATE.match(item))
+            day = node.get("date") or node.get("day")
+            flag = node.get("available", node.get("isAvailable", node.get("count")))
+            if isinstance(day, str) and ISO_DATE.match(day) and not isinstance(flag, (list, dict)) and flag:
+                found.add(day[:10])
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(payload)
+    return found
+
+
+class AvailabilityProbe:
+    """Checks target dates through the discovered endpoint from inside the browser"""
+
+    def __init__(self, driver, template, timeout=10):
+        self.driver = driver
+        self.template = template
+        self.timeout = timeout
+
+    def fetch(self, month):
+        """(HTTP status, open ISO dates or None) for one month; raises if the request fails outright"""
+        with script_timeout(self.driver, self.timeout):
+            result = self.driver.execute_async_script(FETCH_JS, month_url(self.template, month))
+        status = result.get("status")
+        if status is None:
+            raise Exception(f"Availability request failed: {result.get('error')}")
+        if status != 200:
+            return status, None
+        try:
+            return status, open_dates(json.loads(result["body"]))
+        except ValueError:
+            raise Exception("Availability endpoint did not return JSON")
+
+    def check(self, targets):
+        """(HTTP status, targets reported open in priority order); the list is None on a non-200 status"""
+        opened = set()
+        for month in sorted({target[:7] for target in targets}):
+            status, dates = self.fetch(month)
+            if dates is None:
+                return status, None
+            opened |= dates
+        return 200, [target for target in targets if target in opened]
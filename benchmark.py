@@ -0,0 +1,212 @@
+"""End-to-end latency benchmark for ReserveDate against the local stand-in site.
+
+Drives the same steps as make_reservation, one at a time, and reports the
+wall time of each step so speed changes can be compared against a baseline.
+
+    python benchmark.py --target main --runs 3
+    python benchmark.py --target main_st --runs 1 --json bench.json
+    python benchmark.py --reruns 20
+
+--reruns times the Streamlit script itself (no browser): one cold run of
+main_st.py and then repeated reruns, the cost paid on every widget change and
+every log refresh.
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import resource_filter
+from locators import LocatorMemory
+from release_schedule import ReleaseSchedule
+from session_cache import SessionCache
+from standin_server import StandInSite
+
+# The Streamlit app keeps its ReserveDate in bot_st so reruns don't import selenium
+TARGET_MODULES = {"main": "main", "main_st": "bot_st"}
+
+STEPS = [
+    "login",
+    "navigate_to_calendar",
+    "select_date",
+    "select_carpool",
+    "checkout",
+    "confirm_reservation",
+]
+
+BENCH_USERNAME = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+def run_once(module, site, target_date, max_attempts, sleep_duration, watch=False, release_after=None,
+             cache_dir=None, reuse_session=False, release_mode=False, trace_dir=None, resource_profile=None,
+             probe=False):
+    """Run the full flow once and return per-step wall times in seconds"""
+    timings = {}
+    purchases_before = len(site.purchases)
+
+    start = time.perf_counter()
+    bot = module.ReserveDate(session_cache=SessionCache(path=os.path.join(cache_dir, "session.bin")),
+                             trace_dir=trace_dir, resource_profile=resource_profile, probe=probe,
+                             locator_memory=LocatorMemory(path=os.path.join(cache_dir, "locators.json")))
+    timings["startup"] = time.perf_counter() - start
+    bot.LOGIN_URL = site.url("/login")
+    bot.CHECKOUT_URL_MARKER = site.honk_url("/checkout")
+    bot.SESSION_DOMAINS = (site.host, site.honk_host)
+
+    def login():
+        if not (reuse_session and bot.restore_session(BENCH_USERNAME, BENCH_PASSWORD)):
+            bot.login(BENCH_USERNAME, BENCH_PASSWORD)
+
+    release = None
+    if release_after is not None:
+        # The date opens up while the bot is already polling, so select_date measures detection latency
+        site.available.clear()
+        site.scheduled.clear()
+        release_at = site.now() + release_after
+        site.schedule_release([target_date], release_at)
+        if release_mode:
+            release = ReleaseSchedule(release_at, lead_time=0, window_before=2, dense_interval=0.25)
+
+    def select_date():
+        if release:
+            bot.wait_for_release(release)
+            bot.select_date(target_date, release.dense_attempts(), release.dense_interval, watch=watch)
+            timings["release_to_selected"] = time.time() - release.local_release()
+        else:
+            bot.select_date(target_date, max_attempts, sleep_duration, watch=watch)
+
+    steps = {
+        "login": login,
+        "navigate_to_calendar": bot.navigate_to_calendar,
+        "select_date": select_date,
+        "select_carpool": bot.select_carpool,
+        "checkout": bot.checkout,
+        "confirm_reservation": bot.confirm_reservation,
+    }
+    try:
+        for name in STEPS:
+            start = time.perf_counter()
+            steps[name]()
+            timings[name] = time.perf_counter() - start
+    finally:
+        bot.close()
+        if trace_dir:
+            print(f"Trace written to {bot.tracer.export_to_dir(trace_dir, prefix='bench')}")
+
+    timings["total"] = sum(timings[name] for name in STEPS)
+    return {
+        "timings": timings,
+        "waits": bot.waits.report(),
+        "page_loads": bot.page_loads,
+        "purchased": len(site.purchases) > purchases_before,
+    }
+
+
+def summarize(runs):
+    names = ["startup"] + STEPS + ["total", "release_to_selected"]
+    rows = []
+    for name in names:
+        values = [run["timings"][name] for run in runs if name in run["timings"]]
+        if values:
+            rows.append((name, statistics.median(values), min(values), max(values)))
+    return rows
+
+
+def print_report(rows, runs):
+    print()
+    print(f"{'step':<22}{'median':>10}{'min':>10}{'max':>10}")
+    for name, median, low, high in rows:
+        print(f"{name:<22}{median:>9.3f}s{low:>9.3f}s{high:>9.3f}s")
+    loads = resource_filter.summarize([load for run in runs for load in run["page_loads"]])
+    if loads["loads"]:
+        print(f"\n{loads['loads']} calendar page loads: {loads['avg_load_ms']} ms, "
+              f"{resource_filter.format_bytes(loads['avg_bytes'])} on average")
+    completed = sum(1 for run in runs if run["purchased"])
+    print(f"\n{completed}/{len(runs)} runs reached a confirmed purchase")
+
+
+def measure_reruns(reruns):
+    """(cold run seconds, warm rerun seconds) of main_st.py under Streamlit's AppTest harness"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file("main_st.py", default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        warm.append(time.perf_counter() - start)
+    return cold, warm
+
+
+def print_rerun_report(cold, warm):
+    ordered = sorted(warm)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"\nmain_st.py first run: {cold * 1000:.0f} ms")
+    print(f"{len(warm)} reruns: median {statistics.median(warm) * 1000:.0f} ms, "
+          f"p95 {p95 * 1000:.0f} ms, max {ordered[-1] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ReserveDate against the local stand-in site")
+    parser.add_argument("--target", choices=["main", "main_st"], default="main",
+                        help="Module whose ReserveDate is benchmarked")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--date", type=int, default=15, help="Day of month to reserve")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--sleep-duration", type=float, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every stand-in response")
+    parser.add_argument("--watch", action="store_true", help="Use the in-page calendar watcher instead of refreshing")
+    parser.add_argument("--probe", action="store_true",
+                        help="Poll the stand-in's availability endpoint instead of reloading the calendar")
+    parser.add_argument("--release-after", type=float,
+                        help="Start with the date unavailable and release it this many seconds into the run")
+    parser.add_argument("--release-mode", action="store_true",
+                        help="With --release-after, calibrate the clock, park and poll densely around the release")
+    parser.add_argument("--clock-skew", type=float, default=0.0,
+                        help="Seconds the stand-in server clock runs ahead of this machine")
+    parser.add_argument("--reuse-session", action="store_true",
+                        help="Restore the session cached by the previous run instead of logging in")
+    parser.add_argument("--json", help="Write the raw per-run timings to this file")
+    parser.add_argument("--resource-profile", choices=list(resource_filter.PROFILES),
+                        help="Resource blocking profile (default: RESOURCE_PROFILE or lean)")
+    parser.add_argument("--trace-dir", help="Export a Chrome trace JSON per run into this directory")
+    parser.add_argument("--reruns", type=int,
+                        help="Only time this many Streamlit reruns of main_st.py, without a browser")
+    args = parser.parse_args()
+
+    if args.reruns:
+        cold, warm = measure_reruns(args.reruns)
+        print_rerun_report(cold, warm)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"target": "main_st.py", "first_run": cold, "reruns": warm}, f, indent=2)
+        return
+
+    module = importlib.import_module(TARGET_MODULES[args.target])
+    runs = []
+    cache_dir = tempfile.mkdtemp(prefix="parkingbot-bench-")
+    with StandInSite(available_days=[args.date], latency=args.latency, clock_skew=args.clock_skew) as site:
+        for index in range(args.runs):
+            print(f"Run {index + 1}/{args.runs} against {site.url('/login')}")
+            runs.append(run_once(module, site, args.date, args.max_attempts, args.sleep_duration,
+                                 watch=args.watch, release_after=args.release_after,
+                                 cache_dir=cache_dir, reuse_session=args.reuse_session,
+                                 release_mode=args.release_mode, trace_dir=args.trace_dir,
+                                 resource_profile=args.resource_profile, probe=args.probe))
+
+    rows = summarize(runs)
+    print_report(rows, runs)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": args.target, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1044 @@
+"""Streamlit-flavoured ReserveDate: the browser automation behind main_st.py.
+
+Kept out of main_st.py so the selenium and webdriver imports are only paid
+when a reservation job starts (or the browser pool warms up in the
+background), not on every rerun of the page.  Log lines go to the shared
+run_log buffer that the page displays.
+"""
+import streamlit as st
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.chrome.options import Options
+import time
+import os
+from dotenv import load_dotenv
+from datetime import datetime
+from functools import partial
+from urllib.parse import urlsplit
+import random
+import availability_probe
+import calendar_scan
+import checkpoint
+import metrics
+import page_classifier
+import resource_filter
+from locators import LocatorResolver
+from poll_scheduler import PollScheduler
+from failure_capture import FailureCapture
+from browser_watchdog import BrowserWatchdog
+from driver_pool import get_browser_pool, launch_browser, resolve_driver_paths
+from session_cache import SessionCache
+from tracing import Tracer, traced
+from run_log import get_log_buffer
+from waits import StepWaits
+
+def log_with_timestamp(*args, level="info"):
+    """Modified log_with_timestamp function for Streamlit: records go to the shared log buffer"""
+    get_log_buffer().append(" ".join(str(arg) for arg in args), level)
+
+def chrome_options(network_log=False):
+    """Chrome options for headless mode; network_log records network events for the availability probe"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    
+    # Desktop settings (we'll use desktop settings for all environments to ensure consistency)
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument(f'--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    chrome_options.add_argument('--enable-javascript')
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-infobars')
+    chrome_options.add_argument('--lang=en-US,en;q=0.9')
+    chrome_options.add_argument('--ignore-certificate-errors')
+    chrome_options.add_argument('--allow-running-insecure-content')
+    
+    # Add additional preferences
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation', 'enable-logging'])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_experimental_option('prefs', {
+        'credentials_enable_service': False,
+        'profile.password_manager_enabled': False,
+        'profile.default_content_setting_values.notifications': 2,
+        'profile.managed_default_content_settings.javascript': 1,
+        'profile.managed_default_content_settings.cookies': 1,
+        'profile.managed_default_content_settings.images': 1,
+        'profile.default_content_settings.popups': 2,
+        'profile.managed_default_content_settings.plugins': 1,
+        'profile.managed_default_content_settings.mixed_script': 1,
+        'profile.managed_default_content_settings.media_stream': 2,
+        'profile.managed_default_content_settings.geolocation': 2
+    })
+    if network_log:
+        # Network events in the performance log let the availability probe find the calendar's data endpoint
+        availability_probe.enable_logging(chrome_options)
+    return chrome_options
+
+# Checkpoint state whose handler takes over on each page
+PAGE_STATES = {
+    page_classifier.LOGIN: checkpoint.START,
+    page_classifier.DASHBOARD: checkpoint.LOGGED_IN,
+    page_classifier.CALENDAR: checkpoint.ON_CALENDAR,
+    page_classifier.CARPOOL: checkpoint.DATE_SELECTED,
+    page_classifier.CHECKOUT: checkpoint.AT_CHECKOUT,
+    page_classifier.PURCHASE_CONFIRM: checkpoint.AT_CHECKOUT,
+}
+
+class ReserveDate:
+    # Overridable so the flow can be pointed at the local stand-in site
+    LOGIN_URL = "https://reservenski.parkbrightonresort.com/login"
+    CHECKOUT_URL_MARKER = "honkmobile.com/checkout"
+    SESSION_DOMAINS = ("parkbrightonresort.com", "honkmobile.com")
+
+    def __init__(self, chromedriver_path=None, step_budgets=None, session_cache=None, trace_dir="traces",
+                 resource_profile=None, locator_memory=None, artifacts_dir="artifacts", probe=False, job=None,
+                 checkpoint_dir=None):
+        load_dotenv()
+        # Progress is reported to the job registry entry driving this bot, if any
+        self.job = job
+        # Spans for every step, wait and click; exported as Chrome trace JSON when the run ends
+        self.tracer = Tracer(on_step=job.set_step if job else None)
+        self.trace_dir = trace_dir
+        self.chromedriver_path = chromedriver_path
+        # Skip images, fonts, media and trackers on every load (RESOURCE_PROFILE=off keeps them)
+        self.resource_profile = resource_filter.get_profile(resource_profile)
+        # With probe=True availability is polled through the calendar's JSON endpoint instead of page reloads
+        self.use_probe = probe
+        self.probe = None
+        try:
+            if not chromedriver_path:
+                # Paths are resolved once per process (Streamlit Cloud Chromium or a cached local driver)
+                driver_path, chrome_binary = resolve_driver_paths()
+                if chrome_binary:
+                    st.info("Running on Streamlit Cloud with Chromium")
+                else:
+                    st.info("Running in local environment")
+                st.info(f"Found chromedriver at: {driver_path}")
+            self.driver = self._open_browser()
+            
+        except Exception as e:
+            st.error(f"Chrome initialization failed: {str(e)}")
+            st.error("Additional debugging information:")
+            try:
+                # List contents of relevant directories
+                for path in ["/usr/bin", "/usr/lib/chromium", "/usr/lib/chromium-browser"]:
+                    if os.path.exists(path):
+                        st.error(f"Contents of {path}:")
+                        st.error(str(os.listdir(path)))
+            except Exception as dir_error:
+                st.error(f"Error listing directories: {str(dir_error)}")
+            
+            try:
+                if hasattr(self, 'driver'):
+                    st.error("Page source:")
+                    st.error(self.driver.page_source[:1000])
+            except:
+                pass
+            raise
+        
+        self.page_loads = []
+        # Every wait is bounded by its step's budget and moves on as soon as its condition holds
+        self.waits = StepWaits(self.driver, step_budgets, tracer=self.tracer)
+        # Candidate selectors are checked together; the winning selector and click strategy are remembered
+        self.locators = LocatorResolver(self.driver, self.waits, locator_memory)
+        # Which month the calendar widget shows, so targets in other months are reached in-page
+        self.calendar = calendar_scan.CalendarView(self.driver)
+        # Failure snapshots (HTML, screenshot, URL) are written in the background to a capped directory
+        self.failures = FailureCapture(self.driver, artifacts_dir)
+        # Browser memory and refresh latency; a worn-out browser is recycled during long polling runs
+        self.watchdog = BrowserWatchdog(self.driver, log=log_with_timestamp)
+        # Tag log records written from this thread with the step currently running
+        get_log_buffer().set_step_source(self.tracer.current_step)
+        self.session_cache = session_cache or SessionCache()
+        # (username, password) of the session in the browser, the key of its cache entry
+        self.session_login = None
+        # Reservation progress is checkpointed here so a failed run can resume (see checkpoint.py)
+        self.checkpoint_dir = checkpoint_dir
+        # When a target date was clicked, for the detection-to-payment histogram
+        self.detected_at = None
+        # Counters and histograms go to METRICS_PORT / METRICS_FILE when either is set (see metrics.py)
+        exported = metrics.start(log=lambda message: log_with_timestamp(message, level="warning"))
+        if exported:
+            log_with_timestamp(f"Exporting metrics to {exported}")
+
+    def _open_browser(self):
+        """Launch (or take the pre-warmed) browser and apply the timeout, resource profile and stealth script"""
+        # Only the probe needs the performance log, so its browsers are launched with it rather than pooled
+        self.network_log = self.use_probe
+        if self.network_log:
+            driver = launch_browser(partial(chrome_options, network_log=True), self.chromedriver_path)
+        elif self.chromedriver_path:
+            driver = launch_browser(chrome_options, self.chromedriver_path)
+        else:
+            # Take the pre-warmed browser from the process-wide pool
+            driver = get_browser_pool(chrome_options).acquire()
+
+        # Execute stealth JS
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+            "source": """
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+                Object.defineProperty(navigator, 'plugins', {
+                    get: () => [1, 2, 3, 4, 5]
+                });
+                Object.defineProperty(navigator, 'languages', {
+                    get: () => ['en-US', 'en']
+                });
+                window.chrome = {
+                    runtime: {}
+                };
+            """
+        })
+        
+        # Set page load timeout
+        driver.set_page_load_timeout(30)
+        if self.resource_profile:
+            self.resource_profile.apply(driver)
+        else:
+            resource_filter.clear(driver)
+        return driver
+
+    def reopen_browser(self):
+        """Replace a crashed browser with a fresh one; the cached session is restored into it by the next login step"""
+        self.failures.flush(timeout=5)
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = self._open_browser()
+        self.waits.driver = self.driver
+        self.locators.driver = self.driver
+        self.calendar = calendar_scan.CalendarView(self.driver)
+        self.failures = FailureCapture(self.driver, self.failures.directory)
+        self.watchdog.attach(self.driver)
+        self.probe = None
+
+    def recycle_browser(self, reason):
+        """Swap in a fresh browser mid-run and carry the session over, so no login is needed"""
+        log_with_timestamp(f"Recycling browser ({reason})...")
+        with self.tracer.span("recycle browser", "recycle", reason=reason):
+            self.save_session()
+            self.reopen_browser()
+            self.session_cache.restore(self.driver, *self.session_login)
+            self.driver.get(self.site_root())
+            self.navigate_to_calendar()
+        self.watchdog.recycled(reason)
+        metrics.BROWSER_RECYCLES.inc()
+
+    def refresh_calendar(self):
+        """Reload the calendar page, or recycle the browser instead when the watchdog says it is worn out"""
+        reason = self.watchdog.check()
+        if reason:
+            self.recycle_browser(reason)
+        else:
+            if self.network_log:
+                # Chromedriver buffers the log until it is read; keep only this load's events for discover()
+                availability_probe.drain(self.driver)
+            self.driver.refresh()
+        metrics.REFRESHES.inc()
+        self.calendar.invalidate()
+
+    @traced()
+    def login(self, username, password):
+        try:
+            self.waits.begin("login")
+            log_with_timestamp("Attempting to navigate to login page...")
+            self.driver.get(self.LOGIN_URL)
+            
+            # Wait for page to be fully loaded
+            self.waits.until("login", lambda driver: driver.execute_script('return document.readyState') == 'complete')
+            
+            # Scroll to ensure elements are in view for mobile
+            self.driver.execute_script("window.scrollTo(0, 0);")
+            
+            log_with_timestamp("Waiting for email field...")
+            email_element = self.waits.until(
+                "login", EC.presence_of_element_located((By.ID, "emailAddress"))
+            )
+            self.waits.until("login", EC.element_to_be_clickable((By.ID, "emailAddress")))
+            
+            # Ensure element is in view and click it first (important for mobile)
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", email_element)
+            try:
+                email_element.click()
+            except:
+                self.driver.execute_script("arguments[0].click();", email_element)
+            
+            # Clear and enter email with random delays
+            email_element.clear()
+            for char in username:
+                email_element.send_keys(char)
+                time.sleep(random.uniform(0.1, 0.3))
+            
+            log_with_timestamp("Entering password...")
+            password_element = self.waits.until(
+                "login", EC.presence_of_element_located((By.ID, "password"))
+            )
+            self.waits.until("login", EC.element_to_be_clickable((By.ID, "password")))
+            
+            # Ensure password field is in view and click it
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", password_element)
+            try:
+                password_element.click()
+            except:
+                self.driver.execute_script("arguments[0].click();", password_element)
+            
+            password_element.clear()
+            for char in password:
+                password_element.send_keys(char)
+                time.sleep(random.uniform(0.1, 0.3))
+            
+            log_with_timestamp("Looking for login button...")
+            button_selectors = [
+                (By.CSS_SELECTOR, "button.Login_submitButton__fMHAq"),
+                (By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]"),
+                (By.CSS_SELECTOR, "button[type='submit']"),
+                (By.XPATH, "//button[contains(@class, 'submitButton')]")
+            ]
+            login_button = self.locators.find("login", "login_button", button_selectors, message="Could not find login button")
+            
+            # Ensure login button is in view
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", login_button)
+            
+            log_with_timestamp("Clicking login button...")
+            with self.tracer.span("click login button", "click"):
+                try:
+                    # Remembered strategy first, then native, JS and ActionChains clicks
+                    self.locators.click("login_button", login_button)
+                except Exception as click_error:
+                    log_with_timestamp(f"Click error: {str(click_error)}")
+                    # Try tapping for mobile
+                    try:
+                        actions = ActionChains(self.driver)
+                        actions.move_to_element(login_button)
+                        actions.click()
+                        actions.perform()
+                    except:
+                        self.driver.execute_script("""
+                            var evt = new MouseEvent('touchstart', {
+                                'view': window,
+                                'bubbles': true,
+                                'cancelable': true
+                            });
+                            arguments[0].dispatchEvent(evt);
+                        
+                            setTimeout(function() {
+                                var evt = new MouseEvent('touchend', {
+                                    'view': window,
+                                    'bubbles': true,
+                                    'cancelable': true
+                                });
+                                arguments[0].dispatchEvent(evt);
+                            }, 50);
+                        """, login_button)
+            
+            # Wait until the URL leaves the login page or an error message shows up
+            log_with_timestamp("Waiting for login to complete...")
+            try:
+                outcome, detail = self.waits.until("login", self._login_outcome)
+            except Exception:
+                log_with_timestamp(f"Login failed. Failure snapshot: {self.failures.capture('login')}")
+                raise Exception("Failed to verify login success within the login budget")
+            
+            if outcome == "error":
+                raise Exception(f"Login failed - Error messages found: {', '.join(detail)}")
+            
+            log_with_timestamp(f"Current URL: {detail}")
+            log_with_timestamp("Login successful - URL changed from login page")
+            self.session_login = (username, password)
+            self.save_session()
+            
+        except Exception as e:
+            log_with_timestamp(f"Error during login: {str(e)}", level="error")
+            log_with_timestamp(f"Current URL: {self.driver.current_url}")
+            raise
+
+    @traced()
+    def restore_session(self, username, password):
+        """Reuse a cached session if it is still valid; returns True when login can be skipped"""
+        try:
+            if not self.session_cache.restore(self.driver, username, password):
+                return False
+            log_with_timestamp("Restored cached session, verifying...")
+            self.waits.begin("login")
+            self.driver.get(self.site_root())
+            if self.waits.until("login", self._session_state) == "valid":
+                log_with_timestamp("Cached session is still valid - skipping login")
+                self.session_login = (username, password)
+                return True
+            log_with_timestamp("Cached session has expired - logging in again")
+        except Exception as e:
+            log_with_timestamp(f"Could not reuse cached session: {str(e)}", level="warning")
+        try:
+            self.session_cache.forget(username, password)
+            self.session_cache.clear(self.driver)
+        except Exception as e:
+            log_with_timestamp(f"Could not clear cached session: {str(e)}", level="warning")
+        return False
+
+    def site_root(self):
+        """Root URL of the reservation site, derived from LOGIN_URL"""
+        parts = urlsplit(self.LOGIN_URL)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    @traced()
+    def wait_for_release(self, release):
+        """Calibrate against the server clock while parked on the calendar, then sleep until the dense window"""
+        try:
+            offset, uncertainty = release.calibrate(self.site_root())
+            log_with_timestamp(f"Server clock offset: {offset:+.3f}s (+/- {uncertainty:.3f}s)")
+        except Exception as e:
+            log_with_timestamp(f"Could not measure server clock offset, using local clock: {str(e)}", level="warning")
+        log_with_timestamp(f"Corrected release moment: {release.describe(release.local_release())}")
+        log_with_timestamp(f"Parked on calendar until {release.describe(release.window_start())}...")
+        release.sleep_until(release.window_start())
+        # The parked calendar is minutes old by now
+        self.refresh_calendar()
+
+    def save_session(self):
+        """Write the current cookies and localStorage to the encrypted session cache"""
+        if not self.session_login:
+            return
+        try:
+            count = self.session_cache.save(self.driver, *self.session_login, self.SESSION_DOMAINS)
+            log_with_timestamp(f"Saved {count} session cookies to cache")
+        except Exception as e:
+            log_with_timestamp(f"Could not save session cache: {str(e)}", level="warning")
+
+    def _session_state(self, driver):
+        """Wait condition after restoring a session: 'valid' on the dashboard, 'expired' if bounced to login"""
+        if "login" in driver.current_url.lower():
+            return "expired"
+        if driver.find_elements(By.XPATH, "//div[contains(text(), 'Reserve a Parking Spot')]"):
+            return "valid"
+        return False
+
+    def _login_outcome(self, driver):
+        """Wait condition for login: ('success', url) once off the login page, ('error', messages) on visible errors"""
+        current_url = driver.current_url
+        if "login" not in current_url.lower():
+            return ("success", current_url)
+        error_messages = [
+            msg.text for msg in driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert']")
+            if msg.text.strip()
+        ]
+        if error_messages:
+            return ("error", error_messages)
+        return False
+
+    def identify_page(self):
+        """Which page of the flow the browser is on (see page_classifier)"""
+        return page_classifier.identify(self.driver, self.CHECKOUT_URL_MARKER)
+
+    def follow_page(self, progress):
+        """Point the checkpoint at the handler for the page the browser is actually on.
+
+        Only jumps forward, never past date selection or into payment; the
+        login page (an expired session) sends the run back to the session step.
+        """
+        if progress.state == checkpoint.START:
+            return
+        page = self.identify_page()
+        target = PAGE_STATES.get(page)
+        if target is None or target == progress.state:
+            return
+        if target == checkpoint.START:
+            if progress.resume_state():
+                log_with_timestamp("Landed on the login page, restoring the session first", level="warning")
+                progress.advance(progress.resume_state())
+            return
+        order = checkpoint.STATES.index
+        if order(target) < order(progress.state):
+            return
+        if order(progress.state) <= order(checkpoint.ON_CALENDAR) < order(target):
+            return
+        log_with_timestamp(f"Browser is already on the {page} page, skipping ahead to it")
+        progress.advance(target)
+
+    def _payment_page(self, driver):
+        """Wait condition: the Honk checkout page (or its plate confirmation dialog) has loaded"""
+        page = self.identify_page()
+        return page if page in (page_classifier.CHECKOUT, page_classifier.PURCHASE_CONFIRM) else False
+
+    def _calendar_mounted(self, driver):
+        """Wait condition: the calendar wrapper (or the iframe hosting it) is in the page"""
+        if driver.find_elements(By.CLASS_NAME, "mbsc-calendar-wrapper"):
+            return True
+        for iframe in driver.find_elements(By.TAG_NAME, "iframe"):
+            src = (iframe.get_attribute('src') or '').lower()
+            if 'doubleclick' not in src and 'analytics' not in src:
+                return True
+        return False
+
+    @traced()
+    def navigate_to_calendar(self):
+        try:
+            self.waits.begin("navigate_to_calendar")
+            if self.identify_page() == page_classifier.CALENDAR:
+                # A redirect already landed on the calendar; no link to wait for
+                availability_probe.drain(self.driver)
+                log_with_timestamp("Already on the calendar")
+                return
+            log_with_timestamp("Looking for 'Reserve a Parking Spot' link...")
+            reserve_link = self.waits.until("navigate_to_calendar", EC.element_to_be_clickable((
+                By.XPATH, "//div[contains(text(), 'Reserve a Parking Spot')]"
+            )))
+            
+            # Start the network log afresh so discover_probe() only sees the calendar's own requests
+            availability_probe.drain(self.driver)
+            log_with_timestamp("Found link, attempting to click...")
+            with self.tracer.span("click reserve link", "click"):
+                self.locators.click("reserve_link", reserve_link)
+            
+            log_with_timestamp("Clicked reserve link, waiting for calendar to load...")
+            self.waits.until("navigate_to_calendar", self._calendar_mounted, "Calendar did not load within budget")
+            log_with_timestamp("Calendar navigation completed")
+            
+        except Exception as e:
+            log_with_timestamp(f"Error in navigate_to_calendar: {str(e)}", level="error")
+            log_with_timestamp(f"Current URL: {self.driver.current_url}")
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('navigate_to_calendar')}")
+            raise
+
+    def check_date_availability(self, target_date_cell):
+        """Helper method to check if a scanned date cell has the available (green) background color"""
+        return calendar_scan.is_available(target_date_cell)
+
+    def record_poll(self, result, attempt):
+        """Report the outcome of one calendar check to the job driving this bot"""
+        if self.job:
+            self.job.record_poll(result, attempt)
+
+    def record_page_load(self):
+        """Log the load time and bytes of the current page, so the resource profile's saving can be measured"""
+        try:
+            stats = resource_filter.page_load_stats(self.driver)
+        except Exception:
+            return None
+        self.page_loads.append(stats)
+        metrics.PAGE_LOAD.observe(stats["load_ms"] / 1000)
+        log_with_timestamp(f"Page load: {stats['load_ms']} ms, {resource_filter.format_bytes(stats['bytes'])} "
+                           f"in {stats['requests']} requests")
+        return stats
+
+    def discover_probe(self):
+        """Find the calendar's availability endpoint in the network log once; True when the probe can be used"""
+        if self.use_probe and self.probe is None:
+            template = availability_probe.discover(self.driver)
+            if template:
+                log_with_timestamp(f"Polling availability through {template}")
+                self.probe = availability_probe.AvailabilityProbe(self.driver, template)
+            else:
+                log_with_timestamp("No availability request seen while the calendar loaded, refreshing the page instead")
+                self.use_probe = False
+        return self.probe is not None
+
+    def poll_availability(self, targets, scheduler, max_polls):
+        """Poll the availability endpoint until a target opens; returns (open targets, polls used)"""
+        polls = 0
+        while polls < max_polls:
+            scheduler.wait()
+            polls += 1
+            with self.tracer.span("availability probe", "attempt", attempt=polls):
+                try:
+                    metrics.AVAILABILITY_CHECKS.inc(source="probe")
+                    status, opened = self.probe.check(targets)
+                    # The probe's own fetches are logged too
+                    availability_probe.drain(self.driver)
+                except Exception as e:
+                    log_with_timestamp(f"Availability probe failed ({e}), falling back to page refreshes")
+                    self.probe = None
+                    self.use_probe = False
+                    return [], polls
+            scheduler.record(status)
+            self.record_poll(f"availability endpoint: HTTP {status}", polls)
+            if status in (401, 403):
+                log_with_timestamp(f"Availability endpoint rejected the session ({status}), falling back to page refreshes")
+                self.probe = None
+                self.use_probe = False
+                return [], polls
+            if opened:
+                return opened, polls
+        return [], polls
+
+    @traced()
+    def select_date(self, target_dates, max_attempts, sleep_duration, watch=False, watch_idle=60, scheduler=None):
+        """Poll the calendar until one of target_dates is available, then click the highest-priority one.
+
+        target_dates is an ISO date, a string like '2026-11-15,2026-11-28..2026-12-02'
+        (bare days mean this month) or a list, in priority order; every scan
+        checks all of them at once.  Targets in another month are reached with
+        the calendar's own month buttons rather than a page load.
+        With watch=True the page is not refreshed between checks: an in-page
+        MutationObserver waits for the date to open up, and the page is only
+        refreshed after watch_idle seconds without a change or when the
+        calendar unmounts.
+        With the availability probe enabled the calendar's JSON endpoint is
+        polled instead, and the page is only reloaded once it reports a
+        target open.
+        The delay before each refresh comes from scheduler (a PollScheduler,
+        by default one with sleep_duration as its base interval), which backs
+        off after errors, slow loads and server pressure.
+        Returns the ISO date that was clicked.
+        """
+        targets = calendar_scan.parse_targets(target_dates)
+        wanted = ", ".join(targets)
+        # The widget may have been reloaded or paged since the last call
+        self.calendar.invalidate()
+
+        def wait(condition):
+            return self.waits.until("select_date", condition)
+
+        if scheduler is None:
+            scheduler = PollScheduler(sleep_duration, log=log_with_timestamp)
+        attempt = 0
+        measure_load = True
+        load = {}
+        selected = None
+        
+        while attempt < max_attempts:
+            with self.tracer.span("select_date attempt", "attempt", attempt=attempt + 1):
+                try:
+                    self.waits.begin("select_date")
+                    if measure_load:
+                        load = self.record_page_load() or {}
+                        measure_load = False
+                    # Initialize calendar_iframe
+                    calendar_iframe = None
+                
+                    # Find and switch to the calendar iframe
+                    calendar_iframe = calendar_scan.find_calendar_iframe(self.driver)
+                
+                    if calendar_iframe:
+                        self.driver.switch_to.frame(calendar_iframe)
+                
+                    # One script call per month view returns date, visibility and colour for every day cell
+                    with metrics.CALENDAR_SCAN.time():
+                        found, chosen, target_date = self.calendar.scan(targets, wait)
+                    metrics.AVAILABILITY_CHECKS.inc(source="scan")
+                
+                    if found:
+                        if target_date:
+                            with self.tracer.span("click date", "click", date=target_date["text"]):
+                                clicked = calendar_scan.click_cell(self.driver, target_date)
+                            if not clicked:
+                                raise Exception(f"Calendar re-rendered before date {chosen} could be clicked")
+                            log_with_timestamp(f"Successfully selected available date {chosen}")
+                            selected = chosen
+                            self.detected_at = time.monotonic()
+                            self.record_poll(f"date {chosen} available, selected", attempt + 1)
+                            break
+                        elif watch:
+                            log_with_timestamp(f"Date {wanted} not available yet. Watching calendar...")
+                            self.record_poll("not available, watching", attempt + 1)
+                            self.calendar.goto(calendar_scan.target_months(targets)[0], wait)
+                            result = calendar_scan.watch_for_day(self.driver, targets, watch_idle)
+                            metrics.AVAILABILITY_CHECKS.inc(source="watch")
+                            if result["status"] == "available":
+                                # Rescan and click on the next pass, no reload needed
+                                log_with_timestamp(f"Calendar watcher saw date {result['date']} open up")
+                            else:
+                                log_with_timestamp(f"Calendar watcher stopped ({result['status']}). Refreshing...")
+                                self.record_poll(f"watcher stopped ({result['status']})", attempt + 1)
+                                self.refresh_calendar()
+                                measure_load = True
+                                attempt += 1
+                        elif self.discover_probe():
+                            log_with_timestamp(f"Date {wanted} not available yet. Polling the availability endpoint...")
+                            self.record_poll("not available, polling availability endpoint", attempt + 1)
+                            scheduler.record(load.get("status"), load.get("load_ms"))
+                            opened, polls = self.poll_availability(targets, scheduler, max_attempts - attempt)
+                            attempt += polls
+                            if opened:
+                                log_with_timestamp(f"Availability endpoint reports {', '.join(opened)} open. Reloading calendar...")
+                            if opened or not self.probe:
+                                self.refresh_calendar()
+                                measure_load = True
+                        else:
+                            log_with_timestamp(f"Date {wanted} not available yet. Refreshing...")
+                            self.record_poll("not available", attempt + 1)
+                            scheduler.record(load.get("status"), load.get("load_ms"))
+                            scheduler.wait()
+                            self.refresh_calendar()
+                            measure_load = True
+                            attempt += 1
+                    else:
+                        # Usually a target month the calendar cannot page to yet; poll like an unavailable date
+                        log_with_timestamp(f"Could not find date element {wanted}, its month may not be open yet. Refreshing...",
+                                           level="warning")
+                        self.record_poll("date not found", attempt + 1)
+                        scheduler.record(load.get("status"), load.get("load_ms"))
+                        scheduler.wait()
+                        self.refresh_calendar()
+                        measure_load = True
+                        attempt += 1
+                    
+                    if calendar_iframe:
+                        self.driver.switch_to.default_content()
+                    
+                except Exception as e:
+                    log_with_timestamp(f"Error in select_date: {e}", level="error")
+                    metrics.STEP_EXCEPTIONS.inc(step=checkpoint.ON_CALENDAR)
+                    metrics.RETRIES.inc(kind="poll")
+                    self.record_poll(f"error: {e}", attempt + 1)
+                    if calendar_iframe:
+                        self.driver.switch_to.default_content()
+                    attempt += 1
+                    scheduler.record(load.get("status"), error=e)
+                    scheduler.wait()
+                    self.refresh_calendar()
+                    measure_load = True
+
+        if attempt >= max_attempts:
+            raise Exception(f"Failed to find available date after {max_attempts} attempts")
+        return selected
+
+    @traced()
+    def select_carpool(self):
+        try:
+            self.waits.begin("select_carpool")
+            log_with_timestamp("Looking for carpool option...")
+            carpool_element = self.waits.until("select_carpool", EC.element_to_be_clickable((
+                By.XPATH, "//div[text()='4+ Carpool (Occupancy will be verified by Parking Ambassador upon arrival)']"
+            )))
+            
+            log_with_timestamp("Found carpool option, attempting to click...")
+            with self.tracer.span("click carpool option", "click"):
+                strategy = self.locators.click("carpool_option", carpool_element)
+                log_with_timestamp(f"Clicked carpool option using {strategy} click")
+            
+            # Verify selection as soon as the element picks up a selected/active state
+            try:
+                self.waits.until("select_carpool", lambda driver: any(
+                    state in (carpool_element.get_attribute("class") or "").lower()
+                    for state in ("selected", "active")
+                ), cap=2)
+                log_with_timestamp("Carpool option selection verified")
+            except:
+                log_with_timestamp("Warning: Could not check carpool selection state", level="warning")
+                    
+        except Exception as e:
+            log_with_timestamp(f"Error in select_carpool: {e}", level="error")
+            log_with_timestamp(f"Current URL: {self.driver.current_url}")
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('select_carpool')}")
+            raise
+
+    @traced()
+    def checkout(self):
+        try:
+            self.waits.begin("checkout")
+            # Updated selector to match the exact button structure
+            checkout_button = self.waits.until("checkout", EC.element_to_be_clickable((
+                By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), 'Pay $10.00 & Park')]"
+            )))
+            
+            # Get the parent button element
+            parent_button = checkout_button.find_element(
+                By.XPATH, "./ancestor::button"
+            )
+            
+            with self.tracer.span("click checkout button", "click"):
+                self.locators.click("checkout_button", parent_button)
+                    
+        except Exception as e:
+            log_with_timestamp(f"Error in checkout: {e}", level="error")
+
+    @traced()
+    def confirm_reservation(self, before_submit=None):
+        """Pay on the checkout page and verify the purchase.
+
+        before_submit is called right before the click that commits the
+        payment, so the checkpoint records it even if the browser dies mid-click.
+        """
+        try:
+            self.waits.begin("confirm_reservation")
+            self.tracer.phase("load checkout page")
+            log_with_timestamp("Waiting for payment page to load...")
+            try:
+                page = self.waits.until("confirm_reservation", self._payment_page)
+            except Exception:
+                page = self.identify_page()  # Reported below along with the URL
+            
+            # First check if we're on the Honk payment page
+            current_url = self.driver.current_url
+            log_with_timestamp(f"Current URL: {current_url}")
+            
+            if page in (page_classifier.CHECKOUT, page_classifier.PURCHASE_CONFIRM):
+                log_with_timestamp("Detected Honk payment page, looking for payment button...")
+                self.save_session()  # Keep the Honk origin's storage for the next run
+                
+                if page == page_classifier.PURCHASE_CONFIRM:
+                    # The Pay click already went through (e.g. before a retry); go straight to the dialog
+                    log_with_timestamp("License plate confirmation dialog is already open")
+                else:
+                    self.tracer.phase("find payment button")
+                    # Updated payment button selectors based on the actual HTML structure
+                    payment_selectors = [
+                        (By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), 'Pay $10.00 & Park')]"),
+                        (By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[text()='Pay $10.00 & Park']"),
+                        (By.XPATH, "//button//div[contains(text(), 'Pay $10.00 & Park')]"),
+                        (By.XPATH, "//div[contains(@data-uw-rm-sr, 'Pay $10.00 & Park')]")
+                    ]
+                
+                    # All selectors are checked in one query per poll; a label div resolves to its button
+                    payment_button = None
+                    try:
+                        payment_button = self.locators.find(
+                            "confirm_reservation", "payment_button", payment_selectors, closest="button"
+                        )
+                        log_with_timestamp("Found payment button")
+                    except Exception as e:
+                        log_with_timestamp(f"Payment button lookup failed: {str(e)}")
+                
+                    if not payment_button:
+                        log_with_timestamp(f"Could not find payment button. Failure snapshot: {self.failures.capture('confirm_reservation')}", level="warning")
+                        raise Exception("Payment button not found")
+                
+                    self.tracer.phase("click payment button")
+                    # Try to click the payment button
+                    try:
+                        log_with_timestamp("Attempting to click payment button...")
+                        self.driver.execute_script("arguments[0].scrollIntoView(true);", payment_button)
+                        self.locators.click("payment_button", payment_button, order=("js", "native", "actions"))
+                        log_with_timestamp("Payment button clicked")
+                    except Exception as e:
+                        log_with_timestamp(f"Error clicking payment button: {str(e)}", level="error")
+                        raise
+
+                self.tracer.phase("confirm license plate")
+                # Wait for and handle the license plate confirmation dialog
+                log_with_timestamp("Waiting for license plate confirmation dialog...")
+                try:
+                    # Wait for the confirmation dialog title
+                    self.waits.until("confirm_reservation", EC.presence_of_element_located((
+                        By.XPATH, "//h1[contains(@class, 'PurchaseConfirm--header') and contains(text(), 'Does this look right?')]"
+                    )))
+                    log_with_timestamp("Found license plate confirmation dialog")
+
+                    # Look for and click the Confirm button using the specific class
+                    confirm_button = self.waits.until("confirm_reservation", EC.element_to_be_clickable((
+                        By.XPATH, "//button[contains(@class, 'oGMkMQAoYbD7f3oxRBJI ButtonComponent')]"
+                    )))
+                    log_with_timestamp("Found confirm button")
+                    
+                    # Click the confirm button
+                    if before_submit:
+                        before_submit()
+                    with self.tracer.span("click confirm button", "click"):
+                        try:
+                            self.driver.execute_script("arguments[0].scrollIntoView(true);", confirm_button)
+                            self.driver.execute_script("arguments[0].click();", confirm_button)
+                            log_with_timestamp("Clicked confirm button")
+                        except Exception as e:
+                            log_with_timestamp(f"Error clicking confirm button: {str(e)}", level="error")
+                            raise
+                except Exception as e:
+                    log_with_timestamp(f"Error handling license plate confirmation: {str(e)}", level="error")
+                    raise Exception("Failed to confirm license plate")
+                
+                self.tracer.phase("verify payment")
+                # Wait for payment processing and verify success
+                log_with_timestamp("Waiting for payment to process...")
+                max_wait_time = 30
+                # One script call per poll reports pending, success (with the plate) or error messages
+                poll_interval = 0.25
+                start_time = time.time()
+                success_verified = False
+                initial_url = self.driver.current_url
+                last_url = initial_url
+                last_report = start_time
+                
+                while time.time() - start_time < max_wait_time:
+                    try:
+                        outcome = page_classifier.payment_outcome(self.driver, initial_url)
+                    except Exception as e:
+                        log_with_timestamp(f"Error during verification: {str(e)}", level="error")
+                        time.sleep(poll_interval)
+                        continue
+                    
+                    if outcome["url"] != last_url:
+                        last_url = outcome["url"]
+                        log_with_timestamp(f"Current URL during verification: {last_url}")
+                    if outcome["state"] == page_classifier.PAYMENT_ERROR:
+                        log_with_timestamp("Found error messages:", outcome["messages"])
+                        raise Exception(f"Payment failed with errors: {', '.join(outcome['messages'])}")
+                    if outcome["state"] == page_classifier.PAYMENT_SUCCESS:
+                        if outcome["plate"]:
+                            log_with_timestamp("Found vehicle plate display:", outcome["plate"])
+                        if outcome["messages"]:
+                            log_with_timestamp("Found success indicators:", outcome["messages"])
+                        success_verified = True
+                        break
+                    
+                    if time.time() - last_report >= 5:
+                        last_report = time.time()
+                        log_with_timestamp("Still waiting for confirmation...")
+                    time.sleep(poll_interval)
+                
+                if not success_verified:
+                    log_with_timestamp(f"Payment verification failed. Failure snapshot: {self.failures.capture('confirm_reservation')}")
+                    raise Exception("Could not verify payment success - URL never changed from checkout page")
+                
+                log_with_timestamp("Payment completed and verified successfully!")
+            else:
+                raise Exception(f"Unexpected page '{page}' at {current_url}")
+            
+        except Exception as e:
+            log_with_timestamp(f"Error in confirm_reservation: {str(e)}", level="error")
+            log_with_timestamp("Final URL:", self.driver.current_url)
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('confirm_reservation')}")
+            raise
+
+    def close(self):
+        # Let queued failure snapshots finish before the browser goes away
+        self.failures.flush()
+        self.driver.quit()
+
+    def make_reservation(self, username, password, target_date, max_attempts, sleep_duration,
+                         watch=False, watch_idle=60, release=None, max_recoveries=2):
+        """Main method to execute the full reservation process.
+
+        With a ReleaseSchedule the bot logs in release.lead_time seconds before
+        the release, parks on the calendar, and polls at release.dense_interval
+        only inside the window around the clock-corrected release moment.
+        One PollScheduler paces every refresh, so backoff and the circuit
+        breaker carry over from the dense window to normal polling.
+        Each step is a checkpointed state (see checkpoint.py).  When a step
+        fails before the payment is submitted, a dead browser is reopened and
+        the run resumes from the calendar with the chosen date first, up to
+        max_recoveries times; a checkpoint left by an earlier run for the
+        same targets is resumed the same way.
+        """
+        try:
+            targets = calendar_scan.parse_targets(target_date)
+            log_with_timestamp("Starting reservation process...")
+            log_with_timestamp(f"Target date(s) in priority order: {', '.join(targets)}")
+            log_with_timestamp(f"Max attempts: {max_attempts}")
+            log_with_timestamp(f"Sleep duration: {sleep_duration} seconds")
+            if watch:
+                log_with_timestamp(f"Watch mode: refresh only after {watch_idle} seconds without a change")
+            
+            progress = checkpoint.ReservationCheckpoint(username, targets, self.checkpoint_dir)
+            if progress.load():
+                if progress.state == checkpoint.PAYMENT_SUBMITTED:
+                    log_with_timestamp(f"A previous run submitted payment for {progress.chosen_date} at "
+                                       f"{datetime.fromtimestamp(progress.updated_at):%Y-%m-%d %H:%M:%S} without "
+                                       f"confirming it. Check your Honk reservations, then clear it with the "
+                                       f"button under the form to book again.", level="error")
+                    metrics.RESERVATIONS.inc(outcome="refused")
+                    return False
+                log_with_timestamp(f"Resuming previous run from checkpoint '{progress.state}'"
+                                   + (f" with date {progress.chosen_date} chosen" if progress.chosen_date else ""))
+                progress.advance(progress.resume_state())
+            elif release:
+                log_with_timestamp(f"Release mode: release at {release.describe(release.release_at)}")
+                log_with_timestamp(f"Waiting until {release.describe(release.stage_at())} to log in...")
+                release.sleep_until(release.stage_at())
+            
+            scheduler = PollScheduler(sleep_duration, log=log_with_timestamp)
+            
+            def run_step(state):
+                if state == checkpoint.START:
+                    if not self.restore_session(username, password):
+                        self.login(username, password)
+                    progress.advance(checkpoint.LOGGED_IN)
+                elif state == checkpoint.LOGGED_IN:
+                    log_with_timestamp("Attempting to navigate to calendar...")
+                    self.navigate_to_calendar()
+                    progress.advance(checkpoint.ON_CALENDAR)
+                elif state == checkpoint.ON_CALENDAR:
+                    wanted = progress.prioritized_targets()
+                    if release and not progress.chosen_date:
+                        self.wait_for_release(release)
+                        # Refresh at the dense interval only inside the clock-corrected window
+                        scheduler.hot_window = (release.window_start(), release.window_end())
+                        scheduler.hot_interval = release.dense_interval
+                        log_with_timestamp("Polling densely around the release...")
+                        try:
+                            chosen = self.select_date(wanted, release.dense_attempts(), release.dense_interval, watch,
+                                                      watch_idle, scheduler)
+                        except Exception as e:
+                            if "Failed to find available date" not in str(e):
+                                raise
+                            log_with_timestamp("Release window passed without the date opening, continuing at the normal interval")
+                            chosen = self.select_date(wanted, max_attempts, sleep_duration, watch, watch_idle, scheduler)
+                    else:
+                        log_with_timestamp("Attempting to select date...")
+                        chosen = self.select_date(wanted, max_attempts, sleep_duration, watch, watch_idle, scheduler)
+                    progress.advance(checkpoint.DATE_SELECTED, chosen_date=chosen)
+                elif state == checkpoint.DATE_SELECTED:
+                    log_with_timestamp("Attempting to select carpool option...")
+                    self.select_carpool()
+                    progress.advance(checkpoint.CARPOOL_SELECTED)
+                elif state == checkpoint.CARPOOL_SELECTED:
+                    log_with_timestamp("Proceeding to checkout...")
+                    self.checkout()
+                    progress.advance(checkpoint.AT_CHECKOUT)
+                elif state == checkpoint.AT_CHECKOUT:
+                    log_with_timestamp("Confirming reservation...")
+                    # Written before the payment is committed, so a crash can never lead to paying twice
+                    self.confirm_reservation(before_submit=lambda: progress.advance(checkpoint.PAYMENT_SUBMITTED))
+                    progress.advance(checkpoint.DONE)
+                    if self.detected_at is not None:
+                        metrics.DETECTION_TO_PAYMENT.observe(time.monotonic() - self.detected_at)
+            
+            recoveries = 0
+            while progress.state != checkpoint.DONE:
+                try:
+                    self.follow_page(progress)
+                    run_step(progress.state)
+                except Exception as e:
+                    metrics.STEP_EXCEPTIONS.inc(step=progress.state)
+                    resume = progress.resume_state()
+                    if resume is None or recoveries >= max_recoveries or "Failed to find available date" in str(e):
+                        raise
+                    recoveries += 1
+                    metrics.RETRIES.inc(kind="recovery")
+                    log_with_timestamp(f"Step '{progress.state}' failed: {str(e)}", level="warning")
+                    try:
+                        self.driver.current_url
+                    except Exception:
+                        log_with_timestamp("Browser is not responding, reopening it...", level="warning")
+                        self.reopen_browser()
+                    log_with_timestamp(f"Resuming from checkpoint (recovery {recoveries}/{max_recoveries})"
+                                       + (f" with date {progress.chosen_date} chosen" if progress.chosen_date else ""))
+                    progress.advance(resume)
+            
+            progress.clear()
+            metrics.RESERVATIONS.inc(outcome="success")
+            log_with_timestamp("Reservation process completed successfully!")
+            return True
+            
+        except Exception as e:
+            log_with_timestamp(f"Error during reservation process: {str(e)}", level="error")
+            metrics.RESERVATIONS.inc(outcome="failure")
+            log_with_timestamp("Attempting to capture error state...")
+            try:
+                log_with_timestamp(f"Current URL: {self.driver.current_url}")
+                log_with_timestamp(f"Failure snapshot: {self.failures.capture('reservation')}")
+            except:
+                log_with_timestamp("Could not capture error state", level="warning")
+            return False
+        finally:
+            log_with_timestamp(f"Time spent waiting per step: {self.waits.summary()}")
+            if self.watchdog.recycles:
+                log_with_timestamp(f"Browser recycled {self.watchdog.recycles} time(s); "
+                                   f"peak memory {self.watchdog.peak_rss / (1024 * 1024):.0f} MB")
+            if self.page_loads:
+                loads = resource_filter.summarize(self.page_loads)
+                profile = self.resource_profile.name if self.resource_profile else "off"
+                log_with_timestamp(f"Average over {loads['loads']} page loads with resource profile '{profile}': "
+                                   f"{loads['avg_load_ms']} ms, {resource_filter.format_bytes(loads['avg_bytes'])}")
+            if self.trace_dir:
+                try:
+                    log_with_timestamp(f"Trace written to {self.tracer.export_to_dir(self.trace_dir)}")
+                except Exception as e:
+                    log_with_timestamp(f"Could not write trace: {str(e)}", level="warning")
+            metrics.flush()
+            log_with_timestamp("Closing browser...")
+            self.close()
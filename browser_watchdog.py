@@ -0,0 +1,163 @@
+"""Watch a long-running browser and say when it should be recycled.
+
+Hours of calendar refreshes grow the renderer's memory, and a hung renderer
+only shows up once a page load hits its 30s timeout.  A BrowserWatchdog times
+every WebDriver command the browser is sent (scripts, element lookups and
+clicks as well as reloads) and samples the resident memory of chromedriver and
+every Chrome process under it (through psutil when it is installed, /proc otherwise).  After
+each refresh check() returns a reason to recycle the browser when memory is
+over the limit, a command stalled, or the configured number of refreshes has
+gone by; otherwise None.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Async scripts wait in the page on purpose (the calendar watcher, the availability fetch)
+UNTIMED_COMMANDS = ("w3cExecuteScriptAsync", "executeAsyncScript")
+
+
+def _proc_tree_rss(root_pid):
+    """(rss bytes, process count) for root_pid and its descendants, read from /proc"""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # The command name may contain spaces; the fields after its closing paren are fixed
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total, count, pending = 0, 0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+            count += 1
+        except (OSError, IndexError, ValueError):
+            continue
+        pending.extend(children.get(pid, []))
+    return total, count
+
+
+def tree_rss(root_pid):
+    """(rss bytes, process count) of a process tree, or None when it can't be measured here"""
+    if psutil:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total, count = 0, 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+                count += 1
+            except psutil.Error:
+                continue
+        return total, count
+    if os.path.isdir("/proc"):
+        return _proc_tree_rss(root_pid)
+    return None
+
+
+def driver_pid(driver):
+    """PID of the chromedriver process behind a local WebDriver, or None"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class BrowserWatchdog:
+    """Memory and command-latency checks for one browser at a time"""
+
+    def __init__(self, driver, max_rss_mb=None, stall_seconds=20.0, recycle_every=None, sample_every=5, log=None):
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else float(os.getenv("BROWSER_MAX_RSS_MB") or 1500)
+        self.stall_seconds = stall_seconds
+        # 0 turns the fixed recycle interval off; memory and stalls still trigger one
+        self.recycle_every = recycle_every if recycle_every is not None else int(os.getenv("BROWSER_RECYCLE_EVERY") or 0)
+        self.sample_every = sample_every
+        self.log = log
+        self.recycles = 0
+        self.peak_rss = 0
+        self.attach(driver)
+
+    def attach(self, driver):
+        """Start watching a (new) browser"""
+        self.driver = driver
+        self.pid = driver_pid(driver)
+        self.refreshes = 0
+        self.stalled = None
+        self.last_rss = None
+        self._time_commands(driver)
+
+    def _time_commands(self, driver):
+        """Route every command the driver sends (WebElement calls included) through timed()"""
+        execute = getattr(driver, "_untimed_execute", None) or driver.execute
+        driver._untimed_execute = execute
+
+        def timed_execute(driver_command, params=None):
+            if driver_command in UNTIMED_COMMANDS:
+                return execute(driver_command, params)
+            with self.timed(driver_command):
+                return execute(driver_command, params)
+        driver.execute = timed_execute
+
+    @contextmanager
+    def timed(self, command):
+        """Time one WebDriver command; a slow or timed-out one marks the browser as stalled"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if type(e).__name__ == "TimeoutException":
+                self.stalled = (command, time.perf_counter() - start)
+            raise
+        else:
+            elapsed = time.perf_counter() - start
+            if elapsed > self.stall_seconds:
+                self.stalled = (command, elapsed)
+
+    def sample(self):
+        """Measure the browser's memory and log it; returns rss bytes or None"""
+        measured = tree_rss(self.pid) if self.pid else None
+        if not measured:
+            return None
+        rss, count = measured
+        self.last_rss = rss
+        self.peak_rss = max(self.peak_rss, rss)
+        self._log(f"Browser memory: {rss / (1024 * 1024):.0f} MB in {count} processes "
+                  f"after {self.refreshes} refreshes (peak {self.peak_rss / (1024 * 1024):.0f} MB)")
+        return rss
+
+    def check(self):
+        """Count a refresh; returns why the browser should be recycled before the next one, or None"""
+        self.refreshes += 1
+        if self.stalled:
+            command, elapsed = self.stalled
+            return f"{command} took {elapsed:.1f}s"
+        if self.recycle_every and self.refreshes >= self.recycle_every:
+            return f"{self.refreshes} refreshes"
+        if self.refreshes % self.sample_every == 0:
+            rss = self.sample()
+            if rss and rss > self.max_rss_mb * 1024 * 1024:
+                return f"memory {rss / (1024 * 1024):.0f} MB over {self.max_rss_mb:.0f} MB"
+        return None
+
+    def recycled(self, reason):
+        self.recycles += 1
+        self._log(f"Browser recycled ({reason}); {self.recycles} recycle(s) this run")
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
@@ -0,0 +1,380 @@
+"""Single round-trip calendar snapshots for select_date.
+
+Rather than asking chromedriver for every cell's visibility, text and colour
+one call at a time, one injected script returns the whole Mobiscroll month
+and availability is classified from that snapshot in Python.  Cells are keyed
+by their full ISO date (from data-date, the aria-label, or the header month),
+so days shown from the adjacent months never match a target.  Several targets
+can be checked against the same snapshot, in priority order, and CalendarView
+moves between months with the widget's own next/previous buttons instead of
+reloading the page.  In watch mode a MutationObserver blocks inside the page
+until a target cell turns green.
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+AVAILABLE_COLOR = "rgba(49, 200, 25, 0.2)"
+DAY_TEXT_SELECTOR = "div.mbsc-calendar-cell-text.mbsc-calendar-day-text"
+UNAVAILABLE_CLASSES = ("mbsc-disabled",)
+MONTH_BUTTON_SELECTORS = {
+    "next": ".mbsc-calendar-button-next",
+    "prev": ".mbsc-calendar-button-prev",
+}
+
+FIND_CALENDAR_IFRAME_JS = """
+var frames = document.getElementsByTagName('iframe');
+for (var i = 0; i < frames.length; i++) {
+    var src = (frames[i].getAttribute('src') || '').toLowerCase();
+    if (src.indexOf('doubleclick') === -1 && src.indexOf('analytics') === -1) {
+        return frames[i];
+    }
+}
+return null;
+"""
+
+# Shared by the scan and watch scripts: the mounted month and each cell's ISO date
+CELL_DATES_JS = """
+function pad(n) { return (n < 10 ? '0' : '') + n; }
+function isoDate(d) { return d.getFullYear() + '-' + pad(d.getMonth() + 1) + '-' + pad(d.getDate()); }
+function mountedMonth(wrapper) {
+    var title = wrapper.querySelector('.mbsc-calendar-title');
+    var match = title && (title.textContent || '').match(/([A-Za-z]+)\\s*(\\d{4})/);
+    if (match) {
+        var parsed = new Date(match[1] + ' 1, ' + match[2]);
+        if (!isNaN(parsed)) return isoDate(parsed).slice(0, 7);
+    }
+    return null;
+}
+function cellDate(cell, text, month) {
+    var key = cell.getAttribute('data-date') || cell.getAttribute('data-full');
+    if (key && /^\\d{4}-\\d{2}-\\d{2}/.test(key)) return key.slice(0, 10);
+    var label = cell.getAttribute('aria-label');
+    if (label) {
+        var parsed = new Date(label.replace(/^[A-Za-z]+,\\s*/, ''));
+        if (!isNaN(parsed)) return isoDate(parsed);
+    }
+    if (month && /^\\d+$/.test(text) && !cell.classList.contains('mbsc-calendar-day-outer')) {
+        return month + '-' + pad(parseInt(text, 10));
+    }
+    return null;
+}
+"""
+
+SCAN_CALENDAR_JS = CELL_DATES_JS + """
+var wrapper = document.querySelector('.mbsc-calendar-wrapper');
+if (!wrapper) {
+    return {mounted: false, month: null, cells: []};
+}
+var month = mountedMonth(wrapper);
+var nodes = document.querySelectorAll(arguments[0]);
+var cells = [];
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var style = window.getComputedStyle(el);
+    var cell = el.closest('.mbsc-calendar-cell') || el;
+    var text = (el.textContent || '').trim();
+    cells.push({
+        index: i,
+        text: text,
+        date: cellDate(cell, text, month),
+        outer: cell.classList.contains('mbsc-calendar-day-outer'),
+        visible: el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none',
+        color: style.backgroundColor,
+        classes: cell.className
+    });
+}
+if (!month) {
+    for (var j = 0; j < cells.length; j++) {
+        if (!cells[j].outer && cells[j].date) { month = cells[j].date.slice(0, 7); break; }
+    }
+}
+return {mounted: true, month: month, cells: cells};
+"""
+
+CLICK_CELL_JS = """
+var el = document.querySelectorAll(arguments[0])[arguments[1]];
+if (!el || (el.textContent || '').trim() !== arguments[2]) {
+    return false;
+}
+el.scrollIntoView(true);
+el.click();
+return true;
+"""
+
+# Click the widget's own month button; returns the month shown before the click, or null without a button
+STEP_MONTH_JS = CELL_DATES_JS + """
+var wrapper = document.querySelector('.mbsc-calendar-wrapper');
+var button = wrapper && wrapper.querySelector(arguments[0]);
+if (!button || button.disabled || button.getAttribute('aria-disabled') === 'true') return null;
+var before = mountedMonth(wrapper);
+button.click();
+return before || '';
+"""
+
+
+def find_calendar_iframe(driver):
+    """Return the first non-ad iframe (the calendar host), or None"""
+    return driver.execute_script(FIND_CALENDAR_IFRAME_JS)
+
+
+def scan_calendar(driver):
+    """Return {'mounted': bool, 'month': 'YYYY-MM', 'cells': [...]} for every day cell in one call"""
+    return driver.execute_script(SCAN_CALENDAR_JS, DAY_TEXT_SELECTOR)
+
+
+def mounted_snapshot(driver):
+    """Wait condition: a snapshot once the calendar has rendered its cells"""
+    snapshot = scan_calendar(driver)
+    if snapshot and snapshot["mounted"] and snapshot["cells"]:
+        return snapshot
+    return False
+
+
+def is_available(cell):
+    """Classify a snapshot cell as available (green background, not disabled)"""
+    classes = (cell.get("classes") or "").split()
+    if any(name in classes for name in UNAVAILABLE_CLASSES):
+        return False
+    return cell.get("color") == AVAILABLE_COLOR
+
+
+def _parse_day(text, today):
+    """ISO date from 'YYYY-MM-DD', or from a bare day of month taken as the current month"""
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            return date.fromisoformat(text)
+        if re.fullmatch(r"\d{1,2}", text):
+            return today.replace(day=int(text))
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid target date {text!r}, expected YYYY-MM-DD or a day of this month")
+
+
+def parse_targets(value, today=None):
+    """ISO date targets in priority order.
+
+    Accepts '2026-11-15', '2026-11-28..2026-12-02', bare days of the current
+    month ('15', 15, '20-22'), a comma-separated mix of those, or a list.
+    """
+    today = today or date.today()
+    if isinstance(value, (list, tuple)):
+        parts = [str(part) for part in value]
+    else:
+        parts = str(value).split(",")
+    targets = []
+    for part in (part.strip() for part in parts):
+        if not part:
+            continue
+        if ".." in part:
+            first, last = (_parse_day(end.strip(), today) for end in part.split("..", 1))
+        elif re.fullmatch(r"\d{1,2}-\d{1,2}", part):
+            first, last = (_parse_day(end, today) for end in part.split("-"))
+        else:
+            first = last = _parse_day(part, today)
+        if last < first:
+            raise ValueError(f"Invalid target range {part!r}, the end is before the start")
+        day = first
+        while day <= last:
+            if day.isoformat() not in targets:
+                targets.append(day.isoformat())
+            day += timedelta(days=1)
+    if not targets:
+        raise ValueError("No target date given")
+    return targets
+
+
+def target_months(targets):
+    """'YYYY-MM' months holding the targets, ordered by their highest-priority target"""
+    months = []
+    for target in targets:
+        if target[:7] not in months:
+            months.append(target[:7])
+    return months
+
+
+def find_day(snapshot, target):
+    """The visible in-month cell for ISO date target (adjacent-month days never match)"""
+    for cell in snapshot["cells"]:
+        if cell["visible"] and not cell.get("outer") and cell.get("date") == target:
+            return cell
+    return None
+
+
+def find_days(snapshot, targets):
+    """[(target, cell)] for the targets shown in the snapshot, in priority order"""
+    found = [(target, find_day(snapshot, target)) for target in targets]
+    return [(target, cell) for target, cell in found if cell]
+
+
+def best_available(found):
+    """The highest-priority (target, cell) from find_days that is available, or (None, None)"""
+    for target, cell in found:
+        if is_available(cell):
+            return target, cell
+    return None, None
+
+
+def click_cell(driver, cell):
+    """Scroll to and click a snapshot cell; False if the calendar re-rendered underneath it"""
+    return driver.execute_script(CLICK_CELL_JS, DAY_TEXT_SELECTOR, cell["index"], cell["text"])
+
+
+class CalendarView:
+    """Remembers which month the mounted calendar shows and moves between months in-page.
+
+    The cached month is only trusted until the page reloads (the widget
+    remounts on its default month), so callers invalidate() after a refresh.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.month = None
+
+    def invalidate(self):
+        self.month = None
+
+    def snapshot(self, driver):
+        """mounted_snapshot as a wait condition that also updates the cached month"""
+        snapshot = mounted_snapshot(driver)
+        if snapshot:
+            self.month = snapshot["month"]
+        return snapshot
+
+    def goto(self, month, wait):
+        """Show month ('YYYY-MM') using the widget's next/previous buttons and return its snapshot.
+
+        wait(condition) runs a bounded wait; each click waits until the new
+        month has rendered before the next one.
+        """
+        snapshot = wait(self.snapshot) if self.month is None else None
+        while self.month != month:
+            if self.month is None:
+                raise Exception("Could not tell which month the calendar is showing")
+            direction = "next" if month > self.month else "prev"
+            before = self.driver.execute_script(STEP_MONTH_JS, MONTH_BUTTON_SELECTORS[direction])
+            if before is None:
+                raise Exception(f"Calendar has no {direction} month button to reach {month}")
+
+            def month_changed(driver):
+                snapshot = mounted_snapshot(driver)
+                return snapshot if snapshot and snapshot["month"] != before else False
+            snapshot = wait(month_changed)
+            self.month = snapshot["month"]
+        return snapshot or wait(self.snapshot)
+
+    def scan(self, targets, wait):
+        """Check every month holding a target and return (found, best target, its clickable cell).
+
+        The mounted month is checked first, then the others through the month
+        buttons, stopping once no unvisited month could hold a better target
+        than the best one already available.  Months the widget cannot reach
+        yet are skipped, so found is empty while none of the targets' months is
+        open.  The calendar is left on the best target's month.
+        """
+        snapshot = wait(self.snapshot)
+        pending = sorted(target_months(targets), key=lambda month: month != self.month)
+        found = []
+        while pending:
+            month = pending.pop(0)
+            if month != self.month:
+                try:
+                    snapshot = self.goto(month, wait)
+                except Exception:
+                    continue
+            found = sorted(found + find_days(snapshot, targets), key=lambda item: targets.index(item[0]))
+            best, cell = best_available(found)
+            unseen = [target for target in targets if target[:7] in pending]
+            if best and (not unseen or targets.index(best) < targets.index(unseen[0])):
+                break
+        best, cell = best_available(found)
+        if best and best[:7] != self.month:
+            # Indexes from another month's view are stale; rescan on the month being clicked
+            cell = find_day(self.goto(best[:7], wait), best)
+        return found, best, cell
+
+
+WATCH_CALENDAR_JS = CELL_DATES_JS + """
+var selector = arguments[0], targets = arguments[1], availableColor = arguments[2];
+var idleMs = arguments[3], done = arguments[arguments.length - 1];
+var wrapper = document.querySelector('.mbsc-calendar-wrapper');
+var finished = false, observer = null, ticker = null, timer = null;
+
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(ticker);
+    clearTimeout(timer);
+    done(result);
+}
+
+function check() {
+    var current = document.querySelector('.mbsc-calendar-wrapper');
+    if (!current || !current.isConnected) {
+        return finish({status: 'unmounted'});
+    }
+    wrapper = current;
+    var month = mountedMonth(wrapper);
+    var nodes = document.querySelectorAll(selector);
+    var present = false, best = null;
+    for (var i = 0; i < nodes.length; i++) {
+        var el = nodes[i];
+        var cell = el.closest('.mbsc-calendar-cell') || el;
+        var text = (el.textContent || '').trim();
+        if (cell.classList.contains('mbsc-calendar-day-outer') || el.getClientRects().length === 0) continue;
+        var key = cellDate(cell, text, month);
+        var priority = targets.indexOf(key);
+        if (priority === -1) continue;
+        present = true;
+        if (cell.classList.contains('mbsc-disabled')) continue;
+        if (window.getComputedStyle(el).backgroundColor === availableColor && (!best || priority < best.priority)) {
+            best = {priority: priority, index: i, text: text, date: key};
+        }
+    }
+    if (best) {
+        finish({status: 'available', index: best.index, text: best.text, date: best.date});
+    } else if (!present) {
+        finish({status: 'missing'});
+    }
+}
+
+if (!wrapper) {
+    return finish({status: 'unmounted'});
+}
+observer = new MutationObserver(check);
+observer.observe(document.body, {childList: true, subtree: true, attributes: true,
+                                 attributeFilter: ['class', 'style']});
+// Stylesheet-driven colour changes do not produce mutations, so re-check computed style as well
+ticker = setInterval(check, 250);
+timer = setTimeout(function () { finish({status: 'idle'}); }, idleMs);
+check();
+"""
+
+
+@contextmanager
+def script_timeout(driver, seconds):
+    """Use seconds as the async script timeout inside the with-block, then put the previous one back"""
+    previous = driver.timeouts.script
+    driver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        driver.set_script_timeout(previous)
+
+
+def watch_for_day(driver, targets, idle_timeout):
+    """Block in the page until one of targets turns available, the calendar unmounts, or idle_timeout passes.
+
+    targets is an ISO date or a priority-ordered list of them; only the
+    mounted month is watched.  Returns a dict whose status is 'available'
+    (with the cell index, text and date of the highest-priority open target),
+    'unmounted', 'missing' or 'idle'.
+    """
+    if not isinstance(targets, (list, tuple)):
+        targets = [targets]
+    with script_timeout(driver, idle_timeout + 5):
+        return driver.execute_async_script(
+            WATCH_CALENDAR_JS, DAY_TEXT_SELECTOR, [str(target) for target in targets], AVAILABLE_COLOR,
+            int(idle_timeout * 1000)
+        )
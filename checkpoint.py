@@ -0,0 +1,131 @@
+"""Persisted progress of one reservation, so a crashed run can resume.
+
+make_reservation moves through STATES in order and records each transition in
+a small JSON file per account.  After a failure (or a restart of the whole
+process) the run resumes from the last safe state.  Everything after login
+lives in the site's page state, which does not survive a reload or a new
+browser, so resuming means restoring the session (or logging in again) and
+going back to the calendar with the date that was already chosen first in
+line.  PAYMENT_SUBMITTED is written *before* the click that commits the
+payment; a checkpoint in that state is never resumed, so a payment can't be
+repeated, and DONE is only written once the payment has been verified, so it
+can't be skipped either.  It blocks the account until the user clears it after
+checking their reservations, its date has passed, or hold_age runs out.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import date
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".parkingbot", "checkpoints")
+
+START = "start"
+LOGGED_IN = "logged_in"
+ON_CALENDAR = "on_calendar"
+DATE_SELECTED = "date_selected"
+CARPOOL_SELECTED = "carpool_selected"
+AT_CHECKOUT = "at_checkout"
+PAYMENT_SUBMITTED = "payment_submitted"
+DONE = "done"
+STATES = (START, LOGGED_IN, ON_CALENDAR, DATE_SELECTED, CARPOOL_SELECTED, AT_CHECKOUT, PAYMENT_SUBMITTED, DONE)
+
+# States a run may resume from; each one restarts at START, which restores the session
+RESUMABLE = (START, LOGGED_IN, ON_CALENDAR, DATE_SELECTED, CARPOOL_SELECTED, AT_CHECKOUT)
+
+
+class ReservationCheckpoint:
+    """State, chosen date and transition history of one account's reservation run"""
+
+    def __init__(self, username, targets, directory=None, max_age=6 * 3600, hold_age=48 * 3600):
+        self.targets = list(targets)
+        self.max_age = max_age
+        self.hold_age = hold_age
+        account = hashlib.sha256(username.strip().lower().encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(directory or DEFAULT_CHECKPOINT_DIR, f"{account}.json")
+        self.state = START
+        self.chosen_date = None
+        self.updated_at = None
+        self.history = []
+
+    def load(self):
+        """Pick up a saved checkpoint for the same targets; returns True when there is one to resume.
+
+        A checkpoint stuck at PAYMENT_SUBMITTED is loaded whatever its targets,
+        so the caller can refuse to pay again, until it is hold_age old or its
+        date has passed.
+        """
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if saved.get("state") == PAYMENT_SUBMITTED:
+            if time.time() - saved.get("updated_at", 0) > self.hold_age:
+                return False
+            chosen_date = saved.get("chosen_date")
+            if chosen_date and chosen_date < date.today().isoformat():
+                return False
+        else:
+            if saved.get("targets") != self.targets or saved.get("state") not in RESUMABLE:
+                return False
+            if time.time() - saved.get("updated_at", 0) > self.max_age:
+                return False
+        self.targets = saved.get("targets", self.targets)
+        self.state = saved["state"]
+        self.chosen_date = saved.get("chosen_date")
+        self.updated_at = saved.get("updated_at")
+        self.history = saved.get("history", [])
+        return self.state != START
+
+    def advance(self, state, chosen_date=None):
+        """Record a transition and persist it before returning"""
+        if STATES.index(state) < STATES.index(self.state) and state != self.resume_state():
+            raise Exception(f"Checkpoint cannot move from {self.state} back to {state}")
+        if self.state in (PAYMENT_SUBMITTED, DONE) and state != DONE:
+            raise Exception(f"Checkpoint is at {self.state}; the payment step must not run again")
+        self.state = state
+        if chosen_date:
+            self.chosen_date = chosen_date
+        self.updated_at = time.time()
+        self.history.append({"state": state, "at": self.updated_at})
+        self._write()
+
+    def resume_state(self):
+        """State to continue from after a failure, or None when resuming could repeat the payment"""
+        return START if self.state in RESUMABLE else None
+
+    def prioritized_targets(self):
+        """Targets with the already chosen date (if any) first"""
+        if not self.chosen_date:
+            return list(self.targets)
+        return [self.chosen_date] + [target for target in self.targets if target != self.chosen_date]
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "targets": self.targets,
+                "state": self.state,
+                "chosen_date": self.chosen_date,
+                "updated_at": self.updated_at,
+                "history": self.history,
+            }, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def pending_payment(username, directory=None):
+    """The account's checkpoint if a payment was submitted but never confirmed, else None"""
+    progress = ReservationCheckpoint(username, [], directory)
+    if progress.load() and progress.state == PAYMENT_SUBMITTED:
+        return progress
+    return None
@@ -0,0 +1,198 @@
+"""Process-wide chromedriver resolution and a pre-warmed browser pool.
+
+Driver and browser paths are resolved once per process and remembered on
+disk, so later runs start without touching the network (and keep working
+offline).  When Chrome has updated past the remembered driver, the first
+launch fails; the remembered path is then dropped, resolved again and the
+launch retried once.  The pool keeps one idle headless browser launched in the
+background, so a new reservation job gets a ready driver immediately and the
+next one starts warming as soon as it is handed out.
+"""
+import atexit
+import json
+import os
+import shutil
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+SYSTEM_CHROMIUM = "/usr/bin/chromium"
+SYSTEM_CHROMEDRIVER_PATHS = [
+    "/usr/bin/chromedriver",
+    "/usr/lib/chromium/chromedriver",
+    "/usr/lib/chromium-browser/chromedriver",
+]
+PATH_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".parkingbot", "driver_paths.json")
+
+_resolved = None
+_resolve_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def resolve_driver_paths():
+    """Return (chromedriver_path, chrome_binary or None), resolved once per process"""
+    global _resolved
+    with _resolve_lock:
+        if _resolved is None:
+            _resolved = _resolve()
+        return _resolved
+
+
+def _resolve():
+    # Streamlit Cloud (Debian) ships Chromium and its driver as system packages
+    if os.path.exists(SYSTEM_CHROMIUM):
+        for path in SYSTEM_CHROMEDRIVER_PATHS:
+            if os.path.exists(path):
+                return path, SYSTEM_CHROMIUM
+        raise Exception("Could not find chromedriver in any standard location")
+
+    cached = _read_path_cache()
+    if cached:
+        return cached
+
+    try:
+        driver_path = ChromeDriverManager().install()
+    except Exception:
+        # Offline with nothing cached yet: fall back to a driver on PATH
+        driver_path = shutil.which("chromedriver")
+        if not driver_path:
+            raise
+    _write_path_cache(driver_path, None)
+    return driver_path, None
+
+
+def _forget_driver_paths():
+    """Drop the resolved and remembered paths so the next resolve starts over"""
+    global _resolved
+    with _resolve_lock:
+        _resolved = None
+        try:
+            os.remove(PATH_CACHE_FILE)
+        except OSError:
+            pass
+
+
+def _read_path_cache():
+    try:
+        with open(PATH_CACHE_FILE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    driver_path, binary = cached.get("chromedriver"), cached.get("chrome_binary")
+    if not driver_path or not os.path.exists(driver_path):
+        return None
+    if binary and not os.path.exists(binary):
+        return None
+    return driver_path, binary
+
+
+def _write_path_cache(driver_path, binary):
+    try:
+        os.makedirs(os.path.dirname(PATH_CACHE_FILE), exist_ok=True)
+        with open(PATH_CACHE_FILE, "w") as f:
+            json.dump({"chromedriver": driver_path, "chrome_binary": binary}, f)
+    except OSError:
+        pass
+
+
+def launch_browser(options_factory, chromedriver_path=None):
+    """Start a new Chrome session with freshly built options"""
+    if chromedriver_path is not None:
+        return _launch(options_factory, chromedriver_path, None)
+    try:
+        return _launch(options_factory, *resolve_driver_paths())
+    except SessionNotCreatedException:
+        # Usually a driver remembered from before a Chrome update; resolve a matching one
+        _forget_driver_paths()
+        return _launch(options_factory, *resolve_driver_paths())
+
+
+def _launch(options_factory, driver_path, binary):
+    options = options_factory()
+    if binary:
+        options.binary_location = binary
+    return webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+
+
+def _alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool:
+    """Keeps one idle, already-launched browser ready to hand out"""
+
+    def __init__(self, options_factory, keep_warm=True):
+        self.options_factory = options_factory
+        self.keep_warm = keep_warm
+        self.last_error = None
+        self._idle = []
+        self._warming = None
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Launch an idle browser in the background unless one is ready or on its way"""
+        with self._lock:
+            if self._idle or (self._warming and self._warming.is_alive()):
+                return
+            self._warming = threading.Thread(target=self._warm, daemon=True)
+            self._warming.start()
+
+    def _warm(self):
+        try:
+            driver = launch_browser(self.options_factory)
+        except Exception as e:
+            self.last_error = e
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    def acquire(self):
+        """Hand out the pre-launched browser (or launch one) and, if keep_warm, start warming its replacement"""
+        warming = self._warming
+        if warming and warming.is_alive():
+            # Half-way through a launch already; finishing it beats starting over
+            warming.join()
+        driver = None
+        with self._lock:
+            while self._idle and driver is None:
+                candidate = self._idle.pop()
+                if _alive(candidate):
+                    driver = candidate
+                else:
+                    _quit(candidate)
+        if driver is None:
+            driver = launch_browser(self.options_factory)
+        if self.keep_warm:
+            self.warm()
+        return driver
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            _quit(driver)
+
+
+def get_browser_pool(options_factory, keep_warm=True):
+    """The process-wide pool; the arguments are only used by the first caller"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(options_factory, keep_warm)
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,125 @@
+"""Failure snapshots written by a background worker to a capped artifacts directory.
+
+Dumping driver.page_source into the log pushed the whole serialized DOM
+through the logger, often several times on one failure path.  capture()
+only takes the URL and one screenshot on the calling thread, so the failed
+page is on record before recovery navigates away, and returns the artifact
+path.  A worker thread then fetches the (often multi-megabyte) HTML and writes
+the files next to a small JSON summary; the summary names the URL the HTML came
+from, which differs from the failure URL when recovery had already moved on.
+The oldest snapshots are deleted once the directory exceeds its count or size
+cap.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+
+class FailureCapture:
+    """Queues HTML + screenshot + URL snapshots of a driver's current page"""
+
+    def __init__(self, driver, directory="artifacts", max_snapshots=20, max_bytes=50 * 1024 * 1024,
+                 min_interval=5.0):
+        self.driver = driver
+        self.directory = directory
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        # Nested except blocks report the same failure; one snapshot per page is enough
+        self.min_interval = min_interval
+        self._last = None
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def capture(self, label):
+        """Queue a snapshot of the current page and return its path prefix (files ending .html/.png/.json)"""
+        try:
+            url = self.driver.current_url
+        except Exception:
+            url = None
+        now = time.time()
+        with self._lock:
+            if self._last and self._last[0] == url and now - self._last[1] < self.min_interval:
+                return self._last[2]
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+            prefix = os.path.join(self.directory, f"{stamp}-{re.sub(r'[^A-Za-z0-9_-]+', '_', label)}")
+            self._last = (url, now, prefix)
+        snapshot = {"label": label, "url": url, "failed_at": now, "html": None, "html_url": None, "png": None,
+                    "errors": []}
+        try:
+            snapshot["png"] = self.driver.get_screenshot_as_png()
+        except Exception as e:
+            snapshot["errors"].append(f"screenshot: {e}")
+        snapshot["captured_after_s"] = round(time.time() - now, 3)
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="failure-capture", daemon=True)
+                self._worker.start()
+        self._queue.put((prefix, snapshot))
+        return prefix
+
+    def flush(self, timeout=15):
+        """Wait for queued snapshots to be written, e.g. before the browser is closed"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+    def _run(self):
+        while True:
+            prefix, snapshot = self._queue.get()
+            try:
+                self._fetch_html(snapshot)
+                self._write(prefix, snapshot)
+                self._rotate()
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _fetch_html(self, snapshot):
+        """Read the page's HTML off the recovery path; html_url says which page it is"""
+        try:
+            snapshot["html_url"] = self.driver.current_url
+            snapshot["html"] = self.driver.page_source
+        except Exception as e:
+            snapshot["errors"].append(f"html: {e}")
+
+    def _write(self, prefix, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        if snapshot["html"] is not None:
+            with open(prefix + ".html", "w", encoding="utf-8") as f:
+                f.write(snapshot["html"])
+        if snapshot["png"] is not None:
+            with open(prefix + ".png", "wb") as f:
+                f.write(snapshot["png"])
+        summary = {
+            "label": snapshot["label"],
+            "url": snapshot["url"],
+            "html_url": snapshot["html_url"],
+            "failed_at": datetime.fromtimestamp(snapshot["failed_at"]).isoformat(),
+            "captured_after_s": snapshot["captured_after_s"],
+            "errors": snapshot["errors"],
+        }
+        with open(prefix + ".json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+    def _rotate(self):
+        """Delete the oldest snapshots until the directory is within its count and size caps"""
+        snapshots = {}
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            stem = os.path.splitext(path)[0]
+            snapshots.setdefault(stem, []).append(path)
+        sizes = {stem: sum(os.path.getsize(path) for path in paths) for stem, paths in snapshots.items()}
+        total = sum(sizes.values())
+        # Timestamped names sort oldest first
+        for stem in sorted(snapshots):
+            if len(snapshots) <= self.max_snapshots and total <= self.max_bytes:
+                break
+            for path in snapshots.pop(stem):
+                os.remove(path)
+            total -= sizes[stem]
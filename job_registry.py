@@ -0,0 +1,111 @@
+"""Process-wide registry of background reservation jobs.
+
+Streamlit session state belongs to one browser tab, but the reservation
+thread outlives it.  Jobs are tracked here instead, at module level, so any
+rerun, reconnect or new tab can look up the running job and its progress.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class Job:
+    """Status of one background run, updated by its worker thread"""
+
+    def __init__(self, description=""):
+        self.id = uuid.uuid4().hex[:8]
+        self.description = description
+        self.status = RUNNING
+        self.started_at = time.time()
+        self.finished_at = None
+        self.current_step = None
+        self.last_poll = None
+        self.error = None
+        self.thread = None
+
+    def set_step(self, step):
+        self.current_step = step
+
+    def record_poll(self, result, attempt=None):
+        self.last_poll = {"at": time.time(), "attempt": attempt, "result": result}
+
+    def finish(self, error=None):
+        self.error = str(error) if error else None
+        self.status = FAILED if error else SUCCEEDED
+        self.current_step = None
+        self.finished_at = time.time()
+
+    @property
+    def running(self):
+        return self.status == RUNNING
+
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobRegistry:
+    """Starts jobs on daemon threads and remembers the most recent ones"""
+
+    def __init__(self, history=20):
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, target, *args, description="", **kwargs):
+        """Run target(job, *args, **kwargs) on a daemon thread; the job finishes when target returns or raises.
+
+        Returns None without starting anything while another job is running;
+        the check and the registration happen under one lock, so concurrent
+        clicks can't start two browsers on one account.
+        """
+        job = Job(description)
+
+        def run():
+            try:
+                target(job, *args, **kwargs)
+            except Exception as e:
+                job.finish(e)
+            else:
+                job.finish()
+
+        job.thread = threading.Thread(target=run, name=f"reservation-{job.id}", daemon=True)
+        with self._lock:
+            if any(other.running for other in self._jobs.values()):
+                return None
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].running:
+                    break
+                del self._jobs[oldest]
+            # Started under the lock too, so a job is never registered without its thread running
+            job.thread.start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self):
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def active(self):
+        with self._lock:
+            return next((job for job in reversed(self._jobs.values()) if job.running), None)
+
+
+def get_job_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = JobRegistry()
+        return _registry
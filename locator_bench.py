@@ -0,0 +1,331 @@
+"""Offline micro-benchmark of the locator strategies ReserveDate uses.
+
+Each page of the flow is saved as a static HTML fixture in fixtures/ (scripts
+stripped, the calendar already rendered), loaded from disk into headless
+Chrome with all host resolution disabled, and every locator is timed two
+ways: the WebDriver round trip the bot actually pays (find_elements or
+execute_script), and the query alone inside the page (querySelectorAll,
+document.evaluate or the script body, timed with performance.now over
+batches).  Where a lookup can be written as CSS, XPath and an in-page script
+all three are measured side by side.
+
+    python locator_bench.py --iterations 50
+    python locator_bench.py --pad 3000 --json locators.json
+    python locator_bench.py --write-fixtures
+
+--pad adds that many filler nodes to every page first, since the real sites'
+DOMs are far bigger than the stand-in's and XPath text scans grow with them.
+--write-fixtures regenerates the fixtures from the stand-in site's templates.
+"""
+import argparse
+import calendar
+import json
+import os
+import re
+import statistics
+import time
+from datetime import date
+from pathlib import Path
+
+import calendar_scan
+import page_classifier
+import standin_server
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_MONTH = date(2026, 11, 1)
+FIXTURE_AVAILABLE = (15, 16)
+PLATE = "ABC123"
+
+PAY_TEXT = "Pay $10.00 & Park"
+
+# (page, locator, strategy, query, script arguments); the repo's own locator comes first in each group
+CASES = [
+    ("login", "email field", "css", "#emailAddress", None),
+    ("login", "email field", "xpath", "//*[@id='emailAddress']", None),
+    ("login", "email field", "js", "return document.getElementById('emailAddress');", None),
+    ("login", "login button", "css", "button.Login_submitButton__fMHAq", None),
+    ("login", "login button", "xpath", "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]", None),
+    ("login", "login button", "js",
+     "return Array.prototype.filter.call(document.getElementsByTagName('button'), function (b) {"
+     " return /Login|Sign In/.test(b.textContent); });", None),
+    ("login", "error messages", "css", "[class*='error'], [class*='alert']", None),
+    ("login", "error messages", "xpath", "//*[contains(@class, 'error') or contains(@class, 'alert')]", None),
+    ("dashboard", "reserve link", "xpath", "//div[contains(text(), 'Reserve a Parking Spot')]", None),
+    ("dashboard", "reserve link", "css", "div.DashboardLink", None),
+    ("dashboard", "reserve link", "js",
+     "return Array.prototype.filter.call(document.getElementsByTagName('div'), function (d) {"
+     " return d.firstChild && d.firstChild.nodeValue && d.firstChild.nodeValue.indexOf('Reserve a Parking Spot') !== -1; });",
+     None),
+    ("calendar", "calendar wrapper", "css", ".mbsc-calendar-wrapper", None),
+    ("calendar", "calendar wrapper", "xpath", "//*[contains(@class, 'mbsc-calendar-wrapper')]", None),
+    ("calendar", "iframes", "css", "iframe", None),
+    ("calendar", "day cells", "css", calendar_scan.DAY_TEXT_SELECTOR, None),
+    ("calendar", "day cells", "xpath",
+     "//div[contains(@class, 'mbsc-calendar-cell-text') and contains(@class, 'mbsc-calendar-day-text')]", None),
+    ("calendar", "calendar scan", "js", calendar_scan.SCAN_CALENDAR_JS, [calendar_scan.DAY_TEXT_SELECTOR]),
+    ("calendar", "page signature", "js", page_classifier.SIGNATURE_JS, None),
+    ("carpool", "carpool option", "xpath", f"//div[text()='{standin_server.CARPOOL_TEXT}']", None),
+    ("carpool", "carpool option", "xpath", "//div[starts-with(normalize-space(text()), '4+ Carpool')]", None),
+    ("carpool", "carpool option", "js",
+     "return Array.prototype.filter.call(document.querySelectorAll('div.option'), function (d) {"
+     " return d.textContent.trim().indexOf('4+ Carpool') === 0; });", None),
+    ("checkout", "pay button", "xpath",
+     f"//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), '{PAY_TEXT}')]", None),
+    ("checkout", "pay button", "xpath", f"//button//div[contains(text(), '{PAY_TEXT}')]", None),
+    ("checkout", "pay button", "xpath", f"//div[contains(@data-uw-rm-sr, '{PAY_TEXT}')]", None),
+    ("checkout", "pay button", "css", ".ui.basic.center.aligned.segment button > div", None),
+    ("checkout", "pay button", "js",
+     "return Array.prototype.filter.call(document.querySelectorAll('.ui.basic.center.aligned.segment button div'),"
+     f" function (d) {{ return d.textContent.indexOf('{PAY_TEXT}') !== -1; }});", None),
+    ("checkout", "page signature", "js", page_classifier.SIGNATURE_JS, None),
+    ("purchase_confirm", "confirm header", "xpath",
+     "//h1[contains(@class, 'PurchaseConfirm--header') and contains(text(), 'Does this look right?')]", None),
+    ("purchase_confirm", "confirm header", "css", "h1.PurchaseConfirm--header", None),
+    ("purchase_confirm", "confirm button", "xpath", "//button[contains(@class, 'oGMkMQAoYbD7f3oxRBJI ButtonComponent')]",
+     None),
+    ("purchase_confirm", "confirm button", "css", "button.oGMkMQAoYbD7f3oxRBJI.ButtonComponent", None),
+    ("post_purchase", "success elements", "xpath",
+     "//*[contains(text(), 'Success') or contains(text(), 'Confirmed') or contains(text(), 'Thank you') or "
+     "contains(text(), 'Receipt') or contains(@class, 'ParkingSession_plate__')]", None),
+    ("post_purchase", "plate", "css", ".ParkingSession_plate__q3j4i", None),
+    ("post_purchase", "error messages", "xpath",
+     "//*[contains(@class, 'error') or contains(@class, 'alert') or contains(@class, 'notification')]", None),
+    ("post_purchase", "error messages", "css", "[class*='error'], [class*='alert'], [class*='notification']", None),
+    # The fixture's own file name stands in for the receipt URL marker, so the success branch runs
+    ("post_purchase", "payment outcome", "js", page_classifier.PAYMENT_OUTCOME_JS, ["about:blank", ["post_purchase"]]),
+]
+
+# arguments: strategy, query, script arguments, batches, batch size; returns {count, times (ms per query)}
+IN_PAGE_JS = """
+var strategy = arguments[0], query = arguments[1], args = arguments[2] || [];
+var batches = arguments[3], batchSize = arguments[4];
+var run;
+if (strategy === 'css') {
+    run = function () { return document.querySelectorAll(query).length; };
+} else if (strategy === 'xpath') {
+    run = function () {
+        return document.evaluate(query, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+    };
+} else {
+    var body = new Function(query);
+    run = function () {
+        var result = body.apply(null, args);
+        if (!result) return 0;
+        return result.length === undefined ? 1 : result.length;
+    };
+}
+var count = run();
+var times = [];
+for (var i = 0; i < batches; i++) {
+    var start = performance.now();
+    for (var j = 0; j < batchSize; j++) run();
+    times.push((performance.now() - start) / batchSize);
+}
+return {count: count, times: times};
+"""
+
+# arguments: node count; filler markup shaped like an SPA's nested layout
+PAD_JS = """
+var remaining = arguments[0];
+var host = document.createElement('div');
+host.className = 'bench-padding';
+host.style.display = 'none';
+while (remaining > 0) {
+    var section = document.createElement('section');
+    section.className = 'Layout_section__x1 card';
+    for (var i = 0; i < 9 && remaining > 0; i++, remaining--) {
+        var item = document.createElement('div');
+        item.className = 'Layout_item__y2';
+        item.textContent = 'Filler item ' + remaining;
+        section.appendChild(item);
+    }
+    remaining--;
+    host.appendChild(section);
+}
+document.body.insertBefore(host, document.body.firstChild);
+return document.getElementsByTagName('*').length;
+"""
+
+
+def calendar_markup(month, available):
+    """The mounted Mobiscroll month as the stand-in's render() draws it"""
+    year, index = month.year, month.month
+    open_days = {date(year, index, day).isoformat() for day in available}
+    weeks = calendar.Calendar(firstweekday=6).monthdatescalendar(year, index)
+    while len(weeks) < 6:
+        weeks.append([date.fromordinal(weeks[-1][-1].toordinal() + 1 + i) for i in range(7)])
+    rows = []
+    for week in weeks:
+        cells = []
+        for day in week:
+            classes = "mbsc-calendar-cell mbsc-calendar-day"
+            if day.month != index:
+                classes += " mbsc-calendar-day-outer"
+            if day.isoformat() in open_days:
+                classes += " slot-open"
+            label = f"{day:%A}, {day:%B} {day.day}, {day.year}"
+            cells.append(f'<div class="{classes}" data-date="{day.isoformat()}" aria-label="{label}">'
+                         f'<div class="mbsc-calendar-cell-inner">'
+                         f'<div class="mbsc-calendar-cell-text mbsc-calendar-day-text">{day.day}</div>'
+                         f'</div></div>')
+        rows.append(f'<div class="mbsc-calendar-row">{"".join(cells)}</div>')
+    return ('<div class="mbsc-calendar-wrapper"><div class="mbsc-calendar-header">'
+            '<button class="mbsc-calendar-button mbsc-calendar-button-prev">&lsaquo;</button>'
+            f'<div class="mbsc-calendar-title">{month:%B} {year}</div>'
+            '<button class="mbsc-calendar-button mbsc-calendar-button-next">&rsaquo;</button>'
+            f'</div><div class="mbsc-calendar-table">{"".join(rows)}</div></div>')
+
+
+def _static(title, body):
+    """A stand-in page with its scripts and external assets removed, so it loads from disk offline"""
+    html = standin_server.PAGE_TEMPLATE.format(
+        title=title, available_color=standin_server.AVAILABLE_COLOR, site_json="{}", body=body)
+    html = re.sub(r"<script>.*?</script>\n?", "", html, flags=re.S)
+    html = re.sub(r'@font-face \{[^}]*\}\n|<img class="hero"[^>]*>\n', "", html)
+    return html
+
+
+def build_fixtures():
+    """{page name: static HTML} for every page of the flow"""
+    calendar_body = standin_server.CALENDAR_BODY.replace(
+        '<div id="app">Loading...</div>', f'<div id="app">{calendar_markup(FIXTURE_MONTH, FIXTURE_AVAILABLE)}</div>')
+    carpool_body = calendar_body.replace('<div id="options" hidden>', '<div id="options">').replace(
+        '<div class="ui basic center aligned segment" id="pay" hidden>',
+        '<div class="ui basic center aligned segment" id="pay">')
+    dialog = ('<div class="PurchaseConfirm"><h1 class="PurchaseConfirm--header">Does this look right?</h1>'
+              f'<div class="PurchaseConfirm--plate">{PLATE}</div>'
+              '<button class="oGMkMQAoYbD7f3oxRBJI ButtonComponent">Confirm</button></div>')
+    return {
+        "login": _static("Login", standin_server.LOGIN_BODY),
+        "dashboard": _static("Dashboard", standin_server.DASHBOARD_BODY),
+        "calendar": _static("Reserve", calendar_body),
+        "carpool": _static("Reserve", carpool_body),
+        "checkout": _static("Checkout", standin_server.CHECKOUT_BODY),
+        "purchase_confirm": _static("Checkout", standin_server.CHECKOUT_BODY + dialog + "\n"),
+        "post_purchase": _static("Receipt", standin_server.POST_PURCHASE_BODY.format(plate=PLATE)),
+    }
+
+
+def write_fixtures(directory=FIXTURE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name, html in build_fixtures().items():
+        with open(os.path.join(directory, f"{name}.html"), "w") as f:
+            f.write(html)
+        print(f"Wrote {os.path.join(directory, name + '.html')}")
+
+
+def bench_options():
+    """Headless Chrome that cannot reach any host; fixtures are loaded from file:// URLs"""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--host-resolver-rules=MAP * ~NOTFOUND")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--no-first-run")
+    return options
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def round_trips(driver, strategy, query, args, iterations):
+    """Milliseconds per WebDriver call for one locator, after one warm-up call"""
+    from selenium.webdriver.common.by import By
+
+    if strategy == "js":
+        call = lambda: driver.execute_script(query, *(args or []))
+    else:
+        by = By.CSS_SELECTOR if strategy == "css" else By.XPATH
+        call = lambda: driver.find_elements(by, query)
+    call()
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run(driver, fixture_dir, iterations, batches, batch_size, pad=0, pages=None):
+    results = []
+    for page in dict.fromkeys(case[0] for case in CASES):
+        if pages and page not in pages:
+            continue
+        driver.get(Path(fixture_dir, f"{page}.html").resolve().as_uri())
+        nodes = driver.execute_script(PAD_JS, pad) if pad else driver.execute_script(
+            "return document.getElementsByTagName('*').length;")
+        for case_page, name, strategy, query, args in CASES:
+            if case_page != page:
+                continue
+            in_page = driver.execute_script(IN_PAGE_JS, strategy, query, args, batches, batch_size)
+            trips = round_trips(driver, strategy, query, args, iterations)
+            results.append({
+                "page": page,
+                "nodes": nodes,
+                "locator": name,
+                "strategy": strategy,
+                "query": query if len(query) < 200 else query[:197] + "...",
+                "matches": in_page["count"],
+                "round_trip_ms": {"median": statistics.median(trips), "p95": percentile(trips, 0.95)},
+                "in_page_us": {"median": statistics.median(in_page["times"]) * 1000,
+                               "p95": percentile(in_page["times"], 0.95) * 1000},
+            })
+    return results
+
+
+def print_report(results):
+    page = None
+    for result in results:
+        if result["page"] != page:
+            page = result["page"]
+            print(f"\n{page} ({result['nodes']} nodes)")
+            print(f"  {'locator':<18}{'strategy':<8}{'matches':>8}{'rt median':>11}{'rt p95':>9}"
+                  f"{'page median':>13}{'page p95':>10}")
+        trip, local = result["round_trip_ms"], result["in_page_us"]
+        print(f"  {result['locator']:<18}{result['strategy']:<8}{result['matches']:>8}"
+              f"{trip['median']:>9.2f}ms{trip['p95']:>7.2f}ms{local['median']:>11.1f}us{local['p95']:>8.1f}us")
+        if result["matches"] == 0:
+            print(f"    no match: {result['query']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time CSS, XPath and in-page JS locators on saved page fixtures")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory of <page>.html fixtures")
+    parser.add_argument("--write-fixtures", action="store_true",
+                        help="Regenerate the fixtures from the stand-in site's templates and exit")
+    parser.add_argument("--iterations", type=int, default=30, help="WebDriver round trips per locator")
+    parser.add_argument("--batches", type=int, default=50, help="In-page timing batches per locator")
+    parser.add_argument("--batch-size", type=int, default=20, help="Queries per in-page timing batch")
+    parser.add_argument("--pad", type=int, default=0, help="Filler nodes added to every page before timing")
+    parser.add_argument("--page", action="append", help="Only benchmark this page (repeatable)")
+    parser.add_argument("--chromedriver", help="Path to chromedriver (default: the cached/system one)")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures(args.fixtures)
+        return
+
+    from driver_pool import launch_browser
+
+    driver = launch_browser(bench_options, args.chromedriver)
+    try:
+        results = run(driver, args.fixtures, args.iterations, args.batches, args.batch_size, args.pad, args.page)
+    finally:
+        driver.quit()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"pad": args.pad, "iterations": args.iterations, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Resolve an element from several candidate selectors in one in-page query.
+
+The sites' class names change between deployments, so key elements are found
+through a list of candidate selectors.  Instead of waiting on each candidate in
+turn (a full budget per stale selector), every poll evaluates all of them in a
+single script call and takes the first visible match.  The selector and the
+click strategy (native, js, actions) that worked are remembered on disk and
+tried first on the next run.
+"""
+import json
+import os
+import threading
+
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+
+DEFAULT_MEMORY_PATH = os.path.join(os.path.expanduser("~"), ".parkingbot", "locators.json")
+CLICK_STRATEGIES = ("native", "js", "actions")
+
+# arguments: [[kind, selector], ...], closest (CSS selector or null)
+# returns [element, candidate index] for the first candidate with a visible, enabled match, or null
+RESOLVE_JS = """
+var candidates = arguments[0], closest = arguments[1];
+function visible(el) {
+    if (!el.getClientRects().length || el.disabled) return false;
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+for (var i = 0; i < candidates.length; i++) {
+    var kind = candidates[i][0], selector = candidates[i][1], matches = [];
+    try {
+        if (kind === 'xpath') {
+            var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var j = 0; j < snapshot.snapshotLength; j++) matches.push(snapshot.snapshotItem(j));
+        } else {
+            matches = Array.prototype.slice.call(document.querySelectorAll(selector));
+        }
+    } catch (e) {
+        continue;
+    }
+    for (var k = 0; k < matches.length; k++) {
+        var el = matches[k];
+        if (closest && el.closest) el = el.closest(closest) || el;
+        if (visible(el)) return [el, i];
+    }
+}
+return null;
+"""
+
+
+class LocatorMemory:
+    """Last winning selector and click strategy per locator name, kept in a small JSON file"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_MEMORY_PATH
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, name):
+        return self._entries.get(name, {})
+
+    def remember(self, name, **fields):
+        with self._lock:
+            entry = self._entries.setdefault(name, {})
+            if all(entry.get(key) == value for key, value in fields.items()):
+                return
+            entry.update(fields)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+
+class LocatorResolver:
+    """Finds and clicks elements through candidate selectors, remembering what worked"""
+
+    def __init__(self, driver, waits, memory=None):
+        self.driver = driver
+        self.waits = waits
+        self.memory = memory or LocatorMemory()
+
+    def _ordered(self, name, candidates):
+        remembered = self.memory.get(name).get("selector")
+        return sorted(candidates, key=lambda candidate: candidate[1] != remembered)
+
+    def find(self, step, name, candidates, closest=None, message=""):
+        """Wait within step's budget for the first visible match among (By, selector) candidates.
+
+        closest maps a match to its nearest ancestor matching that CSS
+        selector (e.g. the button around a label div).
+        """
+        ordered = self._ordered(name, candidates)
+        query = [["xpath" if by == By.XPATH else "css", selector] for by, selector in ordered]
+
+        def visible_match(driver):
+            return driver.execute_script(RESOLVE_JS, query, closest) or False
+        visible_match.__qualname__ = f"locate {name}"  # names the wait span
+
+        element, index = self.waits.until(step, visible_match, message or f"No candidate selector matched {name}")
+        self.memory.remember(name, selector=ordered[index][1])
+        return element
+
+    def click(self, name, element, order=CLICK_STRATEGIES):
+        """Click with the strategy that worked last time for name, then fall back to the others"""
+        remembered = self.memory.get(name).get("strategy")
+        strategies = sorted(order, key=lambda strategy: strategy != remembered)
+        for strategy in strategies:
+            try:
+                if strategy == "native":
+                    element.click()
+                elif strategy == "js":
+                    self.driver.execute_script("arguments[0].click();", element)
+                else:
+                    ActionChains(self.driver).move_to_element(element).click().perform()
+            except Exception as e:
+                error = e
+                continue
+            self.memory.remember(name, strategy=strategy)
+            return strategy
+        raise error
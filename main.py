@@ -1,70 +1,189 @@
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 import time
 from datetime import datetime
+from functools import partial
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
+import availability_probe
+import calendar_scan
+import checkpoint
+import metrics
+import page_classifier
+import resource_filter
+from locators import LocatorResolver
+from poll_scheduler import PollScheduler
+from failure_capture import FailureCapture
+from browser_watchdog import BrowserWatchdog
+from driver_pool import get_browser_pool, launch_browser
+from session_cache import SessionCache
+from tracing import Tracer, traced
+from release_schedule import ReleaseSchedule, parse_release_time
+from waits import StepWaits
 
 def log_with_timestamp(*args):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
     message = " ".join(str(arg) for arg in args)
     print(f"[{timestamp}] {message}")
 
+def chrome_options(network_log=False):
+    """Chrome options for headless mode; network_log records network events for the availability probe"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument('--enable-javascript')
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36")
+    chrome_options.add_argument("--accept-lang=en-US")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    chrome_options.add_experimental_option("prefs", {
+        "credentials_enable_service": False,
+        "profile.password_manager_enabled": False,
+    })
+    if network_log:
+        # Network events in the performance log let the availability probe find the calendar's data endpoint
+        availability_probe.enable_logging(chrome_options)
+    return chrome_options
+
+# Checkpoint state whose handler takes over on each page
+PAGE_STATES = {
+    page_classifier.LOGIN: checkpoint.START,
+    page_classifier.DASHBOARD: checkpoint.LOGGED_IN,
+    page_classifier.CALENDAR: checkpoint.ON_CALENDAR,
+    page_classifier.CARPOOL: checkpoint.DATE_SELECTED,
+    page_classifier.CHECKOUT: checkpoint.AT_CHECKOUT,
+    page_classifier.PURCHASE_CONFIRM: checkpoint.AT_CHECKOUT,
+}
+
 class ReserveDate:
-    def __init__(self, chromedriver_path=None):
+    # Overridable so the flow can be pointed at the local stand-in site
+    LOGIN_URL = "https://reservenski.parkbrightonresort.com/login"
+    CHECKOUT_URL_MARKER = "honkmobile.com/checkout"
+    SESSION_DOMAINS = ("parkbrightonresort.com", "honkmobile.com")
+
+    def __init__(self, chromedriver_path=None, step_budgets=None, session_cache=None, trace_dir="traces",
+                 resource_profile=None, locator_memory=None, artifacts_dir="artifacts", probe=False,
+                 checkpoint_dir=None):
         load_dotenv()
-        # Set up Chrome options for headless mode
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument('--enable-javascript')
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36")
-        chrome_options.add_argument("--accept-lang=en-US")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option("useAutomationExtension", False)
-        chrome_options.add_experimental_option("prefs", {
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False,
-        })
-        
-        # Use webdriver-manager to handle ChromeDriver installation and versioning
-        self.service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=self.service, options=chrome_options)
+        # Spans for every step, wait and click; exported as Chrome trace JSON when the run ends
+        self.tracer = Tracer()
+        self.trace_dir = trace_dir
+        self.chromedriver_path = chromedriver_path
+        # Skip images, fonts, media and trackers on every load (RESOURCE_PROFILE=off keeps them)
+        self.resource_profile = resource_filter.get_profile(resource_profile)
+        # With probe=True availability is polled through the calendar's JSON endpoint instead of page reloads
+        self.use_probe = probe
+        self.probe = None
+        self.driver = self._open_browser()
+        self.page_loads = []
+        # Every wait is bounded by its step's budget and moves on as soon as its condition holds
+        self.waits = StepWaits(self.driver, step_budgets, tracer=self.tracer)
+        # Candidate selectors are checked together; the winning selector and click strategy are remembered
+        self.locators = LocatorResolver(self.driver, self.waits, locator_memory)
+        # Which month the calendar widget shows, so targets in other months are reached in-page
+        self.calendar = calendar_scan.CalendarView(self.driver)
+        # Failure snapshots (HTML, screenshot, URL) are written in the background to a capped directory
+        self.failures = FailureCapture(self.driver, artifacts_dir)
+        # Browser memory and refresh latency; a worn-out browser is recycled during long polling runs
+        self.watchdog = BrowserWatchdog(self.driver, log=log_with_timestamp)
+        self.session_cache = session_cache or SessionCache()
+        # (username, password) of the session in the browser, the key of its cache entry
+        self.session_login = None
+        # Reservation progress is checkpointed here so a failed run can resume (see checkpoint.py)
+        self.checkpoint_dir = checkpoint_dir
+        # When a target date was clicked, for the detection-to-payment histogram
+        self.detected_at = None
+        # Counters and histograms go to METRICS_PORT / METRICS_FILE when either is set (see metrics.py)
+        exported = metrics.start(log=log_with_timestamp)
+        if exported:
+            log_with_timestamp(f"Exporting metrics to {exported}")
+
+    def _open_browser(self):
+        """Launch (or take the pre-warmed) browser and apply the timeout, resource profile and stealth script"""
+        # Only the probe needs the performance log, so its browsers are launched with it rather than pooled
+        self.network_log = self.use_probe
+        # Take the pre-warmed browser from the process-wide pool unless a driver path was given
+        if self.network_log:
+            driver = launch_browser(partial(chrome_options, network_log=True), self.chromedriver_path)
+        elif self.chromedriver_path:
+            driver = launch_browser(chrome_options, self.chromedriver_path)
+        else:
+            driver = get_browser_pool(chrome_options).acquire()
         
         # Set page load timeout
-        self.driver.set_page_load_timeout(30)
-        self.wait = WebDriverWait(self.driver, 20)  # Increased wait time
-        self.calendar_wait = WebDriverWait(self.driver, 30)  # Increased calendar wait time
+        driver.set_page_load_timeout(30)
+        if self.resource_profile:
+            self.resource_profile.apply(driver)
+        else:
+            resource_filter.clear(driver)
         
         # Execute CDP commands to prevent detection
-        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
             "source": """
                 Object.defineProperty(navigator, 'webdriver', {
                     get: () => undefined
                 })
             """
         })
+        return driver
+
+    def reopen_browser(self):
+        """Replace a crashed browser with a fresh one; the cached session is restored into it by the next login step"""
+        self.failures.flush(timeout=5)
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = self._open_browser()
+        self.waits.driver = self.driver
+        self.locators.driver = self.driver
+        self.calendar = calendar_scan.CalendarView(self.driver)
+        self.failures = FailureCapture(self.driver, self.failures.directory)
+        self.watchdog.attach(self.driver)
+        self.probe = None
+
+    def recycle_browser(self, reason):
+        """Swap in a fresh browser mid-run and carry the session over, so no login is needed"""
+        log_with_timestamp(f"Recycling browser ({reason})...")
+        with self.tracer.span("recycle browser", "recycle", reason=reason):
+            self.save_session()
+            self.reopen_browser()
+            self.session_cache.restore(self.driver, *self.session_login)
+            self.driver.get(self.site_root())
+            self.navigate_to_calendar()
+        self.watchdog.recycled(reason)
+        metrics.BROWSER_RECYCLES.inc()
+
+    def refresh_calendar(self):
+        """Reload the calendar page, or recycle the browser instead when the watchdog says it is worn out"""
+        reason = self.watchdog.check()
+        if reason:
+            self.recycle_browser(reason)
+        else:
+            if self.network_log:
+                # Chromedriver buffers the log until it is read; keep only this load's events for discover()
+                availability_probe.drain(self.driver)
+            self.driver.refresh()
+        metrics.REFRESHES.inc()
+        self.calendar.invalidate()
 
+    @traced()
     def login(self, username, password):
         try:
+            self.waits.begin("login")
             log_with_timestamp("Attempting to navigate to login page...")
-            self.driver.get("https://reservenski.parkbrightonresort.com/login")
+            self.driver.get(self.LOGIN_URL)
             
             log_with_timestamp("Waiting for email field...")
-            email_element = self.wait.until(EC.presence_of_element_located((By.ID, "emailAddress")))
+            email_element = self.waits.until("login", EC.presence_of_element_located((By.ID, "emailAddress")))
             email_element.clear()
-            time.sleep(1)
             for char in username:
                 email_element.send_keys(char)
                 time.sleep(0.1)
@@ -72,194 +191,386 @@ class ReserveDate:
             log_with_timestamp("Entering password...")
             password_element = self.driver.find_element(By.ID, "password")
             password_element.clear()
-            time.sleep(1)
             for char in password:
                 password_element.send_keys(char)
                 time.sleep(0.1)
             
             log_with_timestamp("Looking for login button...")
-            try:
-                login_button = self.wait.until(EC.element_to_be_clickable((
-                    By.CSS_SELECTOR, "button.Login_submitButton__fMHAq"
-                )))
-            except:
-                try:
-                    login_button = self.wait.until(EC.element_to_be_clickable((
-                        By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]"
-                    )))
-                except:
-                    login_button = self.wait.until(EC.element_to_be_clickable((
-                        By.CSS_SELECTOR, "button[type='submit']"
-                    )))
+            login_button = self.locators.find("login", "login_button", [
+                (By.CSS_SELECTOR, "button.Login_submitButton__fMHAq"),
+                (By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]"),
+                (By.CSS_SELECTOR, "button[type='submit']")
+            ])
             
             log_with_timestamp("Clicking login button...")
-            self.driver.execute_script("arguments[0].click();", login_button)
+            with self.tracer.span("click login button", "click"):
+                self.locators.click("login_button", login_button, order=("js", "native", "actions"))
             
-            # Wait for login to complete and verify
+            # Wait until the URL leaves the login page or an error message shows up
             log_with_timestamp("Waiting for login to complete...")
-            time.sleep(5)
-            
-            # Verify login success by checking URL or specific elements
-            max_retries = 3
-            retry_count = 0
-            while retry_count < max_retries:
-                current_url = self.driver.current_url
-                log_with_timestamp(f"Current URL: {current_url}")
-                
-                if "login" not in current_url.lower():
-                    log_with_timestamp("Login successful - URL changed from login page")
-                    break
-                    
-                try:
-                    # Check if we can find any error messages
-                    error_messages = self.driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert']")
-                    if error_messages:
-                        log_with_timestamp("Found error messages:", [msg.text for msg in error_messages])
-                        raise Exception("Login failed - error message found")
-                except:
-                    pass
-                
-                retry_count += 1
-                if retry_count < max_retries:
-                    log_with_timestamp(f"Login verification attempt {retry_count + 1}/{max_retries}...")
-                    time.sleep(3)
-            
-            if retry_count >= max_retries:
-                raise Exception("Failed to verify login success after multiple attempts")
+            outcome, detail = self.waits.until(
+                "login", self._login_outcome, "Failed to verify login success within the login budget"
+            )
+            if outcome == "error":
+                log_with_timestamp("Found error messages:", detail)
+                raise Exception("Login failed - error message found")
             
+            log_with_timestamp(f"Current URL: {detail}")
+            log_with_timestamp("Login successful - URL changed from login page")
             log_with_timestamp("Login sequence completed and verified")
+            self.session_login = (username, password)
+            self.save_session()
             
         except Exception as e:
             log_with_timestamp(f"Error during login: {str(e)}")
             log_with_timestamp(f"Current URL: {self.driver.current_url}")
-            log_with_timestamp("Page source:")
-            log_with_timestamp(self.driver.page_source[:1000])
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('login')}")
             raise
 
+    @traced()
+    def restore_session(self, username, password):
+        """Reuse a cached session if it is still valid; returns True when login can be skipped"""
+        try:
+            if not self.session_cache.restore(self.driver, username, password):
+                return False
+            log_with_timestamp("Restored cached session, verifying...")
+            self.waits.begin("login")
+            self.driver.get(self.site_root())
+            if self.waits.until("login", self._session_state) == "valid":
+                log_with_timestamp("Cached session is still valid - skipping login")
+                self.session_login = (username, password)
+                return True
+            log_with_timestamp("Cached session has expired - logging in again")
+        except Exception as e:
+            log_with_timestamp(f"Could not reuse cached session: {str(e)}")
+        try:
+            self.session_cache.forget(username, password)
+            self.session_cache.clear(self.driver)
+        except Exception as e:
+            log_with_timestamp(f"Could not clear cached session: {str(e)}")
+        return False
+
+    def site_root(self):
+        """Root URL of the reservation site, derived from LOGIN_URL"""
+        parts = urlsplit(self.LOGIN_URL)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    @traced()
+    def wait_for_release(self, release):
+        """Calibrate against the server clock while parked on the calendar, then sleep until the dense window"""
+        try:
+            offset, uncertainty = release.calibrate(self.site_root())
+            log_with_timestamp(f"Server clock offset: {offset:+.3f}s (+/- {uncertainty:.3f}s)")
+        except Exception as e:
+            log_with_timestamp(f"Could not measure server clock offset, using local clock: {str(e)}")
+        log_with_timestamp(f"Corrected release moment: {release.describe(release.local_release())}")
+        log_with_timestamp(f"Parked on calendar until {release.describe(release.window_start())}...")
+        release.sleep_until(release.window_start())
+        # The parked calendar is minutes old by now
+        self.refresh_calendar()
+
+    def save_session(self):
+        """Write the current cookies and localStorage to the encrypted session cache"""
+        if not self.session_login:
+            return
+        try:
+            count = self.session_cache.save(self.driver, *self.session_login, self.SESSION_DOMAINS)
+            log_with_timestamp(f"Saved {count} session cookies to cache")
+        except Exception as e:
+            log_with_timestamp(f"Could not save session cache: {str(e)}")
+
+    def _session_state(self, driver):
+        """Wait condition after restoring a session: 'valid' on the dashboard, 'expired' if bounced to login"""
+        if "login" in driver.current_url.lower():
+            return "expired"
+        if driver.find_elements(By.XPATH, "//div[contains(text(), 'Reserve a Parking Spot')]"):
+            return "valid"
+        return False
+
+    def _login_outcome(self, driver):
+        """Wait condition for login: ('success', url) once off the login page, ('error', messages) on visible errors"""
+        current_url = driver.current_url
+        if "login" not in current_url.lower():
+            return ("success", current_url)
+        error_messages = [
+            msg.text for msg in driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert']")
+            if msg.text.strip()
+        ]
+        if error_messages:
+            return ("error", error_messages)
+        return False
+
+    def identify_page(self):
+        """Which page of the flow the browser is on (see page_classifier)"""
+        return page_classifier.identify(self.driver, self.CHECKOUT_URL_MARKER)
+
+    def follow_page(self, progress):
+        """Point the checkpoint at the handler for the page the browser is actually on.
+
+        Only jumps forward, never past date selection or into payment; the
+        login page (an expired session) sends the run back to the session step.
+        """
+        if progress.state == checkpoint.START:
+            return
+        page = self.identify_page()
+        target = PAGE_STATES.get(page)
+        if target is None or target == progress.state:
+            return
+        if target == checkpoint.START:
+            if progress.resume_state():
+                log_with_timestamp("Landed on the login page, restoring the session first")
+                progress.advance(progress.resume_state())
+            return
+        order = checkpoint.STATES.index
+        if order(target) < order(progress.state):
+            return
+        if order(progress.state) <= order(checkpoint.ON_CALENDAR) < order(target):
+            return
+        log_with_timestamp(f"Browser is already on the {page} page, skipping ahead to it")
+        progress.advance(target)
+
+    def _payment_page(self, driver):
+        """Wait condition: the Honk checkout page (or its plate confirmation dialog) has loaded"""
+        page = self.identify_page()
+        return page if page in (page_classifier.CHECKOUT, page_classifier.PURCHASE_CONFIRM) else False
+
+    def _calendar_mounted(self, driver):
+        """Wait condition: the calendar wrapper (or the iframe hosting it) is in the page"""
+        if driver.find_elements(By.CLASS_NAME, "mbsc-calendar-wrapper"):
+            return True
+        for iframe in driver.find_elements(By.TAG_NAME, "iframe"):
+            src = (iframe.get_attribute('src') or '').lower()
+            if 'doubleclick' not in src and 'analytics' not in src:
+                return True
+        return False
+
+    @traced()
     def navigate_to_calendar(self):
         try:
-            log_with_timestamp("Waiting for page to load after login...")
-            time.sleep(5)  # Give more time for the page to settle after login
-            
+            self.waits.begin("navigate_to_calendar")
+            if self.identify_page() == page_classifier.CALENDAR:
+                # A redirect already landed on the calendar; no link to wait for
+                availability_probe.drain(self.driver)
+                log_with_timestamp("Already on the calendar")
+                return
             log_with_timestamp("Looking for 'Reserve a Parking Spot' link...")
-            reserve_link = self.wait.until(EC.element_to_be_clickable((
+            reserve_link = self.waits.until("navigate_to_calendar", EC.element_to_be_clickable((
                 By.XPATH, "//div[contains(text(), 'Reserve a Parking Spot')]"
             )))
             
+            # Start the network log afresh so discover_probe() only sees the calendar's own requests
+            availability_probe.drain(self.driver)
             log_with_timestamp("Found link, attempting to click...")
-            try:
-                reserve_link.click()
-            except:
-                try:
-                    self.driver.execute_script("arguments[0].click();", reserve_link)
-                except:
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(reserve_link).click().perform()
+            with self.tracer.span("click reserve link", "click"):
+                self.locators.click("reserve_link", reserve_link)
             
             log_with_timestamp("Clicked reserve link, waiting for calendar to load...")
-            time.sleep(3)
+            self.waits.until("navigate_to_calendar", self._calendar_mounted, "Calendar did not load within budget")
             log_with_timestamp("Calendar navigation completed")
             
         except Exception as e:
             log_with_timestamp(f"Error in navigate_to_calendar: {str(e)}")
             log_with_timestamp(f"Current URL: {self.driver.current_url}")
-            log_with_timestamp("Page source:")
-            log_with_timestamp(self.driver.page_source[:1000])  # Print first 1000 chars of page source
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('navigate_to_calendar')}")
             raise
 
-    def check_date_availability(self, target_date_element):
-        """Helper method to check if date has the available (green) background color"""
+    def check_date_availability(self, target_date_cell):
+        """Helper method to check if a scanned date cell has the available (green) background color"""
+        return calendar_scan.is_available(target_date_cell)
+
+    def record_page_load(self):
+        """Log the load time and bytes of the current page, so the resource profile's saving can be measured"""
         try:
-            background_color = target_date_element.value_of_css_property('background-color')
-            target_color = "rgba(49, 200, 25, 0.2)"
-            return background_color == target_color
-        except Exception as e:
-            log_with_timestamp(f"Error checking date availability: {e}")
-            return False
+            stats = resource_filter.page_load_stats(self.driver)
+        except Exception:
+            return None
+        self.page_loads.append(stats)
+        metrics.PAGE_LOAD.observe(stats["load_ms"] / 1000)
+        log_with_timestamp(f"Page load: {stats['load_ms']} ms, {resource_filter.format_bytes(stats['bytes'])} "
+                           f"in {stats['requests']} requests")
+        return stats
+
+    def discover_probe(self):
+        """Find the calendar's availability endpoint in the network log once; True when the probe can be used"""
+        if self.use_probe and self.probe is None:
+            template = availability_probe.discover(self.driver)
+            if template:
+                log_with_timestamp(f"Polling availability through {template}")
+                self.probe = availability_probe.AvailabilityProbe(self.driver, template)
+            else:
+                log_with_timestamp("No availability request seen while the calendar loaded, refreshing the page instead")
+                self.use_probe = False
+        return self.probe is not None
+
+    def poll_availability(self, targets, scheduler, max_polls):
+        """Poll the availability endpoint until a target opens; returns (open targets, polls used)"""
+        polls = 0
+        while polls < max_polls:
+            scheduler.wait()
+            polls += 1
+            with self.tracer.span("availability probe", "attempt", attempt=polls):
+                try:
+                    metrics.AVAILABILITY_CHECKS.inc(source="probe")
+                    status, opened = self.probe.check(targets)
+                    # The probe's own fetches are logged too
+                    availability_probe.drain(self.driver)
+                except Exception as e:
+                    log_with_timestamp(f"Availability probe failed ({e}), falling back to page refreshes")
+                    self.probe = None
+                    self.use_probe = False
+                    return [], polls
+            scheduler.record(status)
+            if status in (401, 403):
+                log_with_timestamp(f"Availability endpoint rejected the session ({status}), falling back to page refreshes")
+                self.probe = None
+                self.use_probe = False
+                return [], polls
+            if opened:
+                return opened, polls
+        return [], polls
+
+    @traced()
+    def select_date(self, target_dates, max_attempts, sleep_duration, watch=False, watch_idle=60, scheduler=None):
+        """Poll the calendar until one of target_dates is available, then click the highest-priority one.
+
+        target_dates is an ISO date, a string like '2026-11-15,2026-11-28..2026-12-02'
+        (bare days mean this month) or a list, in priority order; every scan
+        checks all of them at once.  Targets in another month are reached with
+        the calendar's own month buttons rather than a page load.
+        With watch=True the page is not refreshed between checks: an in-page
+        MutationObserver waits for the date to open up, and the page is only
+        refreshed after watch_idle seconds without a change or when the
+        calendar unmounts.
+        With the availability probe enabled the calendar's JSON endpoint is
+        polled instead, and the page is only reloaded once it reports a
+        target open.
+        The delay before each refresh comes from scheduler (a PollScheduler,
+        by default one with sleep_duration as its base interval), which backs
+        off after errors, slow loads and server pressure.
+        Returns the ISO date that was clicked.
+        """
+        targets = calendar_scan.parse_targets(target_dates)
+        wanted = ", ".join(targets)
+        # The widget may have been reloaded or paged since the last call
+        self.calendar.invalidate()
 
-    def select_date(self, target_date_text, max_attempts, sleep_duration):
+        def wait(condition):
+            return self.waits.until("select_date", condition)
+
+        if scheduler is None:
+            scheduler = PollScheduler(sleep_duration, log=log_with_timestamp)
         attempt = 0
+        measure_load = True
+        load = {}
+        selected = None
         
         while attempt < max_attempts:
-            try:
-                calendar_iframe = None
-                
-                iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-                for iframe in iframes:
-                    src = iframe.get_attribute('src') or ''
-                    if 'doubleclick' not in src.lower() and 'analytics' not in src.lower():
-                        calendar_iframe = iframe
-                        break
-                
-                if calendar_iframe:
-                    self.driver.switch_to.frame(calendar_iframe)
+            with self.tracer.span("select_date attempt", "attempt", attempt=attempt + 1):
+                try:
+                    self.waits.begin("select_date")
+                    if measure_load:
+                        load = self.record_page_load() or {}
+                        measure_load = False
+                    calendar_iframe = None
                 
-                calendar_container = self.wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "mbsc-calendar-wrapper"))
-                )
+                    calendar_iframe = calendar_scan.find_calendar_iframe(self.driver)
                 
-                date_elements = self.driver.find_elements(
-                    By.CSS_SELECTOR, "div.mbsc-calendar-cell-text.mbsc-calendar-day-text"
-                )
+                    if calendar_iframe:
+                        self.driver.switch_to.frame(calendar_iframe)
                 
-                target_date = None
-                for date in date_elements:
-                    if date.is_displayed() and date.text == str(target_date_text):
-                        target_date = date
-                        break
+                    # One script call per month view returns date, visibility and colour for every day cell
+                    with metrics.CALENDAR_SCAN.time():
+                        found, chosen, target_date = self.calendar.scan(targets, wait)
+                    metrics.AVAILABILITY_CHECKS.inc(source="scan")
                 
-                if target_date:
-                    if self.check_date_availability(target_date):
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", target_date)
-                        time.sleep(1)
-                        self.driver.execute_script("arguments[0].click();", target_date)
-                        log_with_timestamp(f"Successfully selected available date {target_date_text}")
-                        break
+                    if found:
+                        if target_date:
+                            with self.tracer.span("click date", "click", date=target_date["text"]):
+                                clicked = calendar_scan.click_cell(self.driver, target_date)
+                            if not clicked:
+                                raise Exception(f"Calendar re-rendered before date {chosen} could be clicked")
+                            log_with_timestamp(f"Successfully selected available date {chosen}")
+                            selected = chosen
+                            self.detected_at = time.monotonic()
+                            break
+                        elif watch:
+                            log_with_timestamp(f"Date {wanted} not available yet. Watching calendar...")
+                            self.calendar.goto(calendar_scan.target_months(targets)[0], wait)
+                            result = calendar_scan.watch_for_day(self.driver, targets, watch_idle)
+                            metrics.AVAILABILITY_CHECKS.inc(source="watch")
+                            if result["status"] == "available":
+                                # Rescan and click on the next pass, no reload needed
+                                log_with_timestamp(f"Calendar watcher saw date {result['date']} open up")
+                            else:
+                                log_with_timestamp(f"Calendar watcher stopped ({result['status']}). Refreshing...")
+                                self.refresh_calendar()
+                                measure_load = True
+                                attempt += 1
+                        elif self.discover_probe():
+                            log_with_timestamp(f"Date {wanted} not available yet. Polling the availability endpoint...")
+                            scheduler.record(load.get("status"), load.get("load_ms"))
+                            opened, polls = self.poll_availability(targets, scheduler, max_attempts - attempt)
+                            attempt += polls
+                            if opened:
+                                log_with_timestamp(f"Availability endpoint reports {', '.join(opened)} open. Reloading calendar...")
+                            if opened or not self.probe:
+                                self.refresh_calendar()
+                                measure_load = True
+                        else:
+                            log_with_timestamp(f"Date {wanted} not available yet. Refreshing...")
+                            scheduler.record(load.get("status"), load.get("load_ms"))
+                            scheduler.wait()
+                            self.refresh_calendar()
+                            measure_load = True
+                            attempt += 1
                     else:
-                        log_with_timestamp(f"Date {target_date_text} not available yet. Refreshing...")
-                        time.sleep(sleep_duration)
-                        self.driver.refresh()
+                        # Usually a target month the calendar cannot page to yet; poll like an unavailable date
+                        log_with_timestamp(f"Could not find date element {wanted}, its month may not be open yet. Refreshing...")
+                        scheduler.record(load.get("status"), load.get("load_ms"))
+                        scheduler.wait()
+                        self.refresh_calendar()
+                        measure_load = True
                         attempt += 1
-                else:
-                    log_with_timestamp(f"Could not find date element {target_date_text}")
-                    break
                     
-                if calendar_iframe:
-                    self.driver.switch_to.default_content()
+                    if calendar_iframe:
+                        self.driver.switch_to.default_content()
                     
-            except Exception as e:
-                log_with_timestamp(f"Error in select_date: {e}")
-                if calendar_iframe:
-                    self.driver.switch_to.default_content()
-                attempt += 1
-                time.sleep(5)
-                self.driver.refresh()
+                except Exception as e:
+                    log_with_timestamp(f"Error in select_date: {e}")
+                    metrics.STEP_EXCEPTIONS.inc(step=checkpoint.ON_CALENDAR)
+                    metrics.RETRIES.inc(kind="poll")
+                    if calendar_iframe:
+                        self.driver.switch_to.default_content()
+                    attempt += 1
+                    scheduler.record(load.get("status"), error=e)
+                    scheduler.wait()
+                    self.refresh_calendar()
+                    measure_load = True
 
         if attempt >= max_attempts:
             raise Exception(f"Failed to find available date after {max_attempts} attempts")
+        return selected
 
+    @traced()
     def select_carpool(self):
         try:
-            carpool_element = self.wait.until(EC.element_to_be_clickable((
+            self.waits.begin("select_carpool")
+            carpool_element = self.waits.until("select_carpool", EC.element_to_be_clickable((
                 By.XPATH, "//div[text()='4+ Carpool (Occupancy will be verified by Parking Ambassador upon arrival)']"
             )))
             
-            try:
-                carpool_element.click()
-            except:
-                try:
-                    self.driver.execute_script("arguments[0].click();", carpool_element)
-                except:
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(carpool_element).click().perform()
+            with self.tracer.span("click carpool option", "click"):
+                self.locators.click("carpool_option", carpool_element)
                     
         except Exception as e:
             log_with_timestamp(f"Error in select_carpool: {e}")
 
+    @traced()
     def checkout(self):
         try:
+            self.waits.begin("checkout")
             # Updated selector to match the exact button structure
-            checkout_button = self.wait.until(EC.element_to_be_clickable((
+            checkout_button = self.waits.until("checkout", EC.element_to_be_clickable((
                 By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), 'Pay $10.00 & Park')]"
             )))
             
@@ -268,220 +579,304 @@ class ReserveDate:
                 By.XPATH, "./ancestor::button"
             )
             
-            try:
-                parent_button.click()
-            except:
-                try:
-                    self.driver.execute_script("arguments[0].click();", parent_button)
-                except:
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(parent_button).click().perform()
+            with self.tracer.span("click checkout button", "click"):
+                self.locators.click("checkout_button", parent_button)
                     
         except Exception as e:
             log_with_timestamp(f"Error in checkout: {e}")
 
-    def confirm_reservation(self):
+    @traced()
+    def confirm_reservation(self, before_submit=None):
+        """Pay on the checkout page and verify the purchase.
+
+        before_submit is called right before the click that commits the
+        payment, so the checkpoint records it even if the browser dies mid-click.
+        """
         try:
+            self.waits.begin("confirm_reservation")
+            self.tracer.phase("load checkout page")
             log_with_timestamp("Waiting for payment page to load...")
-            time.sleep(5)  # Give page time to settle
+            try:
+                page = self.waits.until("confirm_reservation", self._payment_page)
+            except Exception:
+                page = self.identify_page()  # Reported below along with the URL
             
             # First check if we're on the Honk payment page
             current_url = self.driver.current_url
             log_with_timestamp(f"Current URL: {current_url}")
             
-            if "honkmobile.com/checkout" in current_url:
+            if page in (page_classifier.CHECKOUT, page_classifier.PURCHASE_CONFIRM):
                 log_with_timestamp("Detected Honk payment page, looking for payment button...")
+                self.save_session()  # Keep the Honk origin's storage for the next run
                 
-                # Updated payment button selectors based on the actual HTML structure
-                payment_selectors = [
-                    "//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), 'Pay $10.00 & Park')]",
-                    "//div[contains(@class, 'ui basic center aligned segment')]//div[text()='Pay $10.00 & Park']",
-                    "//button//div[contains(text(), 'Pay $10.00 & Park')]",
-                    "//div[contains(@data-uw-rm-sr, 'Pay $10.00 & Park')]"
-                ]
+                if page == page_classifier.PURCHASE_CONFIRM:
+                    # The Pay click already went through (e.g. before a retry); go straight to the dialog
+                    log_with_timestamp("License plate confirmation dialog is already open")
+                else:
+                    self.tracer.phase("find payment button")
+                    # Updated payment button selectors based on the actual HTML structure
+                    payment_selectors = [
+                        (By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[contains(text(), 'Pay $10.00 & Park')]"),
+                        (By.XPATH, "//div[contains(@class, 'ui basic center aligned segment')]//div[text()='Pay $10.00 & Park']"),
+                        (By.XPATH, "//button//div[contains(text(), 'Pay $10.00 & Park')]"),
+                        (By.XPATH, "//div[contains(@data-uw-rm-sr, 'Pay $10.00 & Park')]")
+                    ]
                 
-                payment_button = None
-                for selector in payment_selectors:
+                    # All selectors are checked in one query per poll; a label div resolves to its button
+                    payment_button = None
                     try:
-                        log_with_timestamp(f"Trying payment selector: {selector}")
-                        payment_button = self.wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                        if payment_button and payment_button.is_displayed():
-                            log_with_timestamp(f"Found payment button with selector: {selector}")
-                            # Get the parent button if we found a div
-                            if payment_button.tag_name.lower() != 'button':
-                                payment_button = payment_button.find_element(By.XPATH, "./ancestor::button")
-                            break
+                        payment_button = self.locators.find(
+                            "confirm_reservation", "payment_button", payment_selectors, closest="button"
+                        )
+                        log_with_timestamp("Found payment button")
                     except Exception as e:
-                        log_with_timestamp(f"Payment selector {selector} failed: {str(e)}")
-                        continue
+                        log_with_timestamp(f"Payment button lookup failed: {str(e)}")
                 
-                if not payment_button:
-                    log_with_timestamp("Could not find payment button. Page source:")
-                    log_with_timestamp(self.driver.page_source[:2000])
-                    raise Exception("Payment button not found")
+                    if not payment_button:
+                        log_with_timestamp(f"Could not find payment button. Failure snapshot: {self.failures.capture('confirm_reservation')}")
+                        raise Exception("Payment button not found")
                 
-                # Try to click the payment button
-                try:
-                    log_with_timestamp("Attempting to click payment button...")
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", payment_button)
-                    time.sleep(1)
-                    self.driver.execute_script("arguments[0].click();", payment_button)
-                    log_with_timestamp("Payment button clicked")
-                except Exception as e:
-                    log_with_timestamp(f"Error clicking payment button: {str(e)}")
-                    raise
+                    self.tracer.phase("click payment button")
+                    # Try to click the payment button
+                    try:
+                        log_with_timestamp("Attempting to click payment button...")
+                        self.driver.execute_script("arguments[0].scrollIntoView(true);", payment_button)
+                        self.locators.click("payment_button", payment_button, order=("js", "native", "actions"))
+                        log_with_timestamp("Payment button clicked")
+                    except Exception as e:
+                        log_with_timestamp(f"Error clicking payment button: {str(e)}")
+                        raise
 
+                self.tracer.phase("confirm license plate")
                 # Wait for and handle the license plate confirmation dialog
                 log_with_timestamp("Waiting for license plate confirmation dialog...")
                 try:
                     # Wait for the confirmation dialog title
-                    self.wait.until(EC.presence_of_element_located((
+                    self.waits.until("confirm_reservation", EC.presence_of_element_located((
                         By.XPATH, "//h1[contains(@class, 'PurchaseConfirm--header') and contains(text(), 'Does this look right?')]"
                     )))
                     log_with_timestamp("Found license plate confirmation dialog")
 
                     # Look for and click the Confirm button using the specific class
-                    confirm_button = self.wait.until(EC.element_to_be_clickable((
+                    confirm_button = self.waits.until("confirm_reservation", EC.element_to_be_clickable((
                         By.XPATH, "//button[contains(@class, 'oGMkMQAoYbD7f3oxRBJI ButtonComponent')]"
                     )))
                     log_with_timestamp("Found confirm button")
                     
                     # Click the confirm button
-                    try:
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", confirm_button)
-                        time.sleep(1)
-                        self.driver.execute_script("arguments[0].click();", confirm_button)
-                        log_with_timestamp("Clicked confirm button")
-                    except Exception as e:
-                        log_with_timestamp(f"Error clicking confirm button: {str(e)}")
-                        raise
+                    if before_submit:
+                        before_submit()
+                    with self.tracer.span("click confirm button", "click"):
+                        try:
+                            self.driver.execute_script("arguments[0].scrollIntoView(true);", confirm_button)
+                            self.driver.execute_script("arguments[0].click();", confirm_button)
+                            log_with_timestamp("Clicked confirm button")
+                        except Exception as e:
+                            log_with_timestamp(f"Error clicking confirm button: {str(e)}")
+                            raise
                 except Exception as e:
                     log_with_timestamp(f"Error handling license plate confirmation: {str(e)}")
                     raise Exception("Failed to confirm license plate")
                 
+                self.tracer.phase("verify payment")
                 # Wait for payment processing and verify success
                 log_with_timestamp("Waiting for payment to process...")
                 max_wait_time = 30
+                # One script call per poll reports pending, success (with the plate) or error messages
+                poll_interval = 0.25
                 start_time = time.time()
                 success_verified = False
                 initial_url = self.driver.current_url
+                last_url = initial_url
+                last_report = start_time
                 
-                while time.time() - start_time < max_wait_time and not success_verified:
+                while time.time() - start_time < max_wait_time:
                     try:
-                        current_url = self.driver.current_url
-                        log_with_timestamp(f"Current URL during verification: {current_url}")
-                        
-                        # Only consider success if URL has changed from the initial checkout URL
-                        if current_url != initial_url:
-                            # Check for success indicators in URL
-                            success_url_indicators = [
-                                "post-purchase" in current_url,
-                                "confirmation" in current_url,
-                                "success" in current_url,
-                                "receipt" in current_url,
-                                "parking-reservation/" in current_url  # Add this new success indicator
-                            ]
-                            
-                            if any(success_url_indicators):
-                                # Additional verification - look for success elements or vehicle plate display
-                                try:
-                                    success_elements = self.driver.find_elements(By.XPATH,
-                                        "//*[contains(text(), 'Success') or contains(text(), 'Confirmed') or contains(text(), 'Thank you') or contains(text(), 'Receipt') or contains(@class, 'ParkingSession_plate__')]"
-                                    )
-                                    if success_elements:
-                                        success_messages = [elem.text for elem in success_elements if elem.is_displayed() and elem.text.strip()]
-                                        if success_messages:
-                                            log_with_timestamp("Found success indicators:", success_messages)
-                                            success_verified = True
-                                            break
-                                        
-                                    # Additional check specifically for the vehicle plate display
-                                    plate_elements = self.driver.find_elements(By.CLASS_NAME, "ParkingSession_plate__q3j4i")
-                                    if plate_elements:
-                                        for elem in plate_elements:
-                                            if elem.is_displayed() and elem.text.strip():
-                                                log_with_timestamp("Found vehicle plate display:", elem.text)
-                                                success_verified = True
-                                                break
-                                except Exception as e:
-                                    log_with_timestamp(f"Error checking success elements: {e}")
-                                    pass
-                        
-                        # Check for error messages
-                        error_elements = self.driver.find_elements(By.XPATH, 
-                            "//*[contains(@class, 'error') or contains(@class, 'alert') or contains(@class, 'notification')]"
-                        )
-                        if error_elements:
-                            error_messages = [elem.text for elem in error_elements if elem.is_displayed() and elem.text.strip()]
-                            if error_messages:
-                                log_with_timestamp("Found error messages:", error_messages)
-                                raise Exception(f"Payment failed with errors: {', '.join(error_messages)}")
-                        
-                        time.sleep(2)
-                        log_with_timestamp("Still waiting for confirmation...")
-                        
+                        outcome = page_classifier.payment_outcome(self.driver, initial_url)
                     except Exception as e:
-                        if "Payment failed with errors" in str(e):
-                            raise
                         log_with_timestamp(f"Error during verification: {str(e)}")
-                        time.sleep(2)
+                        time.sleep(poll_interval)
+                        continue
+                    
+                    if outcome["url"] != last_url:
+                        last_url = outcome["url"]
+                        log_with_timestamp(f"Current URL during verification: {last_url}")
+                    if outcome["state"] == page_classifier.PAYMENT_ERROR:
+                        log_with_timestamp("Found error messages:", outcome["messages"])
+                        raise Exception(f"Payment failed with errors: {', '.join(outcome['messages'])}")
+                    if outcome["state"] == page_classifier.PAYMENT_SUCCESS:
+                        if outcome["plate"]:
+                            log_with_timestamp("Found vehicle plate display:", outcome["plate"])
+                        if outcome["messages"]:
+                            log_with_timestamp("Found success indicators:", outcome["messages"])
+                        success_verified = True
+                        break
+                    
+                    if time.time() - last_report >= 5:
+                        last_report = time.time()
+                        log_with_timestamp("Still waiting for confirmation...")
+                    time.sleep(poll_interval)
                 
                 if not success_verified:
-                    log_with_timestamp("Payment verification failed. Current page source:")
-                    log_with_timestamp(self.driver.page_source[:2000])
+                    log_with_timestamp(f"Payment verification failed. Failure snapshot: {self.failures.capture('confirm_reservation')}")
                     raise Exception("Could not verify payment success - URL never changed from checkout page")
                 
                 log_with_timestamp("Payment completed and verified successfully!")
             else:
-                raise Exception(f"Unexpected URL: {current_url}")
+                raise Exception(f"Unexpected page '{page}' at {current_url}")
             
         except Exception as e:
             log_with_timestamp(f"Error in confirm_reservation: {str(e)}")
             log_with_timestamp("Final URL:", self.driver.current_url)
-            log_with_timestamp("Final page source:")
-            log_with_timestamp(self.driver.page_source[:2000])
+            log_with_timestamp(f"Failure snapshot: {self.failures.capture('confirm_reservation')}")
             raise
 
     def close(self):
+        # Let queued failure snapshots finish before the browser goes away
+        self.failures.flush()
         self.driver.quit()
 
-    def make_reservation(self, username, password, target_date, max_attempts, sleep_duration):
-        """Main method to execute the full reservation process"""
+    def make_reservation(self, username, password, target_date, max_attempts, sleep_duration,
+                         watch=False, watch_idle=60, release=None, max_recoveries=2):
+        """Main method to execute the full reservation process.
+
+        With a ReleaseSchedule the bot logs in release.lead_time seconds before
+        the release, parks on the calendar, and polls at release.dense_interval
+        only inside the window around the clock-corrected release moment.
+        One PollScheduler paces every refresh, so backoff and the circuit
+        breaker carry over from the dense window to normal polling.
+        Each step is a checkpointed state (see checkpoint.py).  When a step
+        fails before the payment is submitted, a dead browser is reopened and
+        the run resumes from the calendar with the chosen date first, up to
+        max_recoveries times; a checkpoint left by an earlier run for the
+        same targets is resumed the same way.
+        """
         try:
+            targets = calendar_scan.parse_targets(target_date)
             log_with_timestamp("\nStarting reservation process...")
-            log_with_timestamp(f"Target date: {target_date}")
+            log_with_timestamp(f"Target date(s) in priority order: {', '.join(targets)}")
             log_with_timestamp(f"Max attempts: {max_attempts}")
             log_with_timestamp(f"Sleep duration: {sleep_duration} seconds")
+            if watch:
+                log_with_timestamp(f"Watch mode: refresh only after {watch_idle} seconds without a change")
             
-            self.login(username, password)
+            progress = checkpoint.ReservationCheckpoint(username, targets, self.checkpoint_dir)
+            if progress.load():
+                if progress.state == checkpoint.PAYMENT_SUBMITTED:
+                    log_with_timestamp(f"A previous run submitted payment for {progress.chosen_date} at "
+                                       f"{datetime.fromtimestamp(progress.updated_at):%Y-%m-%d %H:%M:%S} without "
+                                       f"confirming it. Check your Honk reservations, then run again and clear it "
+                                       f"at the prompt (or delete {progress.path}) to book again.")
+                    metrics.RESERVATIONS.inc(outcome="refused")
+                    return False
+                log_with_timestamp(f"Resuming previous run from checkpoint '{progress.state}'"
+                                   + (f" with date {progress.chosen_date} chosen" if progress.chosen_date else ""))
+                progress.advance(progress.resume_state())
+            elif release:
+                log_with_timestamp(f"Release mode: release at {release.describe(release.release_at)}")
+                log_with_timestamp(f"Waiting until {release.describe(release.stage_at())} to log in...")
+                release.sleep_until(release.stage_at())
             
-            log_with_timestamp("\nAttempting to navigate to calendar...")
-            self.navigate_to_calendar()
+            scheduler = PollScheduler(sleep_duration, log=log_with_timestamp)
             
-            log_with_timestamp("\nAttempting to select date...")
-            self.select_date(target_date, max_attempts, sleep_duration)
-            
-            log_with_timestamp("\nAttempting to select carpool option...")
-            self.select_carpool()
-            
-            log_with_timestamp("\nProceeding to checkout...")
-            self.checkout()
+            def run_step(state):
+                if state == checkpoint.START:
+                    if not self.restore_session(username, password):
+                        self.login(username, password)
+                    progress.advance(checkpoint.LOGGED_IN)
+                elif state == checkpoint.LOGGED_IN:
+                    log_with_timestamp("\nAttempting to navigate to calendar...")
+                    self.navigate_to_calendar()
+                    progress.advance(checkpoint.ON_CALENDAR)
+                elif state == checkpoint.ON_CALENDAR:
+                    wanted = progress.prioritized_targets()
+                    if release and not progress.chosen_date:
+                        self.wait_for_release(release)
+                        # Refresh at the dense interval only inside the clock-corrected window
+                        scheduler.hot_window = (release.window_start(), release.window_end())
+                        scheduler.hot_interval = release.dense_interval
+                        log_with_timestamp("\nPolling densely around the release...")
+                        try:
+                            chosen = self.select_date(wanted, release.dense_attempts(), release.dense_interval, watch,
+                                                      watch_idle, scheduler)
+                        except Exception as e:
+                            if "Failed to find available date" not in str(e):
+                                raise
+                            log_with_timestamp("Release window passed without the date opening, continuing at the normal interval")
+                            chosen = self.select_date(wanted, max_attempts, sleep_duration, watch, watch_idle, scheduler)
+                    else:
+                        log_with_timestamp("\nAttempting to select date...")
+                        chosen = self.select_date(wanted, max_attempts, sleep_duration, watch, watch_idle, scheduler)
+                    progress.advance(checkpoint.DATE_SELECTED, chosen_date=chosen)
+                elif state == checkpoint.DATE_SELECTED:
+                    log_with_timestamp("\nAttempting to select carpool option...")
+                    self.select_carpool()
+                    progress.advance(checkpoint.CARPOOL_SELECTED)
+                elif state == checkpoint.CARPOOL_SELECTED:
+                    log_with_timestamp("\nProceeding to checkout...")
+                    self.checkout()
+                    progress.advance(checkpoint.AT_CHECKOUT)
+                elif state == checkpoint.AT_CHECKOUT:
+                    log_with_timestamp("\nConfirming reservation...")
+                    # Written before the payment is committed, so a crash can never lead to paying twice
+                    self.confirm_reservation(before_submit=lambda: progress.advance(checkpoint.PAYMENT_SUBMITTED))
+                    progress.advance(checkpoint.DONE)
+                    if self.detected_at is not None:
+                        metrics.DETECTION_TO_PAYMENT.observe(time.monotonic() - self.detected_at)
             
-            log_with_timestamp("\nConfirming reservation...")
-            self.confirm_reservation()
+            recoveries = 0
+            while progress.state != checkpoint.DONE:
+                try:
+                    self.follow_page(progress)
+                    run_step(progress.state)
+                except Exception as e:
+                    metrics.STEP_EXCEPTIONS.inc(step=progress.state)
+                    resume = progress.resume_state()
+                    if resume is None or recoveries >= max_recoveries or "Failed to find available date" in str(e):
+                        raise
+                    recoveries += 1
+                    metrics.RETRIES.inc(kind="recovery")
+                    log_with_timestamp(f"\nStep '{progress.state}' failed: {str(e)}")
+                    try:
+                        self.driver.current_url
+                    except Exception:
+                        log_with_timestamp("Browser is not responding, reopening it...")
+                        self.reopen_browser()
+                    log_with_timestamp(f"Resuming from checkpoint (recovery {recoveries}/{max_recoveries})"
+                                       + (f" with date {progress.chosen_date} chosen" if progress.chosen_date else ""))
+                    progress.advance(resume)
             
+            progress.clear()
+            metrics.RESERVATIONS.inc(outcome="success")
             log_with_timestamp("\nReservation process completed successfully!")
+            return True
             
         except Exception as e:
             log_with_timestamp(f"\nError during reservation process: {str(e)}")
+            metrics.RESERVATIONS.inc(outcome="failure")
             log_with_timestamp("Attempting to capture error state...")
             try:
                 log_with_timestamp(f"Current URL: {self.driver.current_url}")
-                log_with_timestamp("Current page source:")
-                log_with_timestamp(self.driver.page_source[:1000])
+                log_with_timestamp(f"Failure snapshot: {self.failures.capture('reservation')}")
             except:
                 log_with_timestamp("Could not capture error state")
+            return False
         finally:
+            log_with_timestamp(f"Time spent waiting per step: {self.waits.summary()}")
+            if self.watchdog.recycles:
+                log_with_timestamp(f"Browser recycled {self.watchdog.recycles} time(s); "
+                                   f"peak memory {self.watchdog.peak_rss / (1024 * 1024):.0f} MB")
+            if self.page_loads:
+                loads = resource_filter.summarize(self.page_loads)
+                profile = self.resource_profile.name if self.resource_profile else "off"
+                log_with_timestamp(f"Average over {loads['loads']} page loads with resource profile '{profile}': "
+                                   f"{loads['avg_load_ms']} ms, {resource_filter.format_bytes(loads['avg_bytes'])}")
+            if self.trace_dir:
+                try:
+                    log_with_timestamp(f"Trace written to {self.tracer.export_to_dir(self.trace_dir)}")
+                except Exception as e:
+                    log_with_timestamp(f"Could not write trace: {str(e)}")
+            metrics.flush()
             log_with_timestamp("\nClosing browser...")
             self.close()
 
@@ -493,6 +888,15 @@ def main():
     # print("2. Only one license plate saved at: https://parking.honkmobile.com/vehicles")
     log_with_timestamp("--------------------------------")
     
+    # Asked first: probe runs launch their own browser with the network log on, the others take a pre-warmed one
+    watch = input('Watch the calendar in-page instead of refreshing? (y/N): ').strip().lower().startswith('y')
+    probe = not watch and input(
+        "Poll the calendar's availability endpoint instead of reloading the page? (y/N): "
+    ).strip().lower().startswith('y')
+    if not probe:
+        # Launch the browser in the background while the prompts below are answered
+        get_browser_pool(chrome_options, keep_warm=False).warm()
+    
     # Load environment variables
     load_dotenv()
     
@@ -506,18 +910,35 @@ def main():
     if not password:
         password = input('Enter your Honk mobile password: ')
     
-    target_date = input('Enter target date (day of month): ')
+    # A payment submitted without confirmation blocks the account until the user has checked it
+    pending = checkpoint.pending_payment(username)
+    if pending:
+        log_with_timestamp(f"A previous run submitted payment for {pending.chosen_date} at "
+                           f"{datetime.fromtimestamp(pending.updated_at):%Y-%m-%d %H:%M:%S} without confirming it.")
+        if input("Have you checked your Honk reservations and want to book again? (y/N): ").strip().lower().startswith('y'):
+            pending.clear()
+    
+    target_date = calendar_scan.parse_targets(
+        input('Enter target date(s) in priority order (e.g. 2026-11-15, 15 for this month, or 2026-11-28..2026-12-02): ')
+    )
     max_attempts = int(input('Maximum number of attempts (default 100): ') or 100)
     sleep_duration = float(input('Sleep duration between attempts in seconds (default 5): ') or 5)
+    release_text = input('Release time, HH:MM or YYYY-MM-DD HH:MM (blank to start polling now): ').strip()
+    release = None
+    if release_text:
+        lead_time = float(input('Log in this many seconds before the release (default 300): ') or 300)
+        release = ReleaseSchedule(parse_release_time(release_text), lead_time=lead_time)
     
-    # Create bot instance without chromedriver_path
-    bot = ReserveDate()
+    # Create bot instance without chromedriver_path so it picks up the pre-warmed browser (unless probing)
+    bot = ReserveDate(probe=probe)
     bot.make_reservation(
         username,
         password,
         target_date,
         max_attempts,
-        sleep_duration
+        sleep_duration,
+        watch=watch,
+        release=release
     )
 
 if __name__ == "__main__":
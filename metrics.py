@@ -0,0 +1,218 @@
+"""Process-wide counters and histograms of the reservation pipeline.
+
+Unattended runs have no view of their health besides the log.  The
+reservation loops update the instruments below (a lock and a few additions
+per update), and they are exposed in the Prometheus text format.  Set
+METRICS_PORT to serve them at http://127.0.0.1:<port>/metrics, or
+METRICS_FILE to have them rewritten every METRICS_INTERVAL seconds (default
+15) into a file, e.g. for node_exporter's textfile collector.  Without either
+the instruments are still updated but never exported.
+"""
+import atexit
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_instruments = []
+_exporters = {}
+_exporters_lock = threading.Lock()
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _instruments.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labels:
+            values[()] = 0
+        return [f"{self.name}{_label_text(self.labels, key)} {_number(value)}" for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Distribution of observed values (in seconds) over fixed cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+        _instruments.append(self)
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the with-block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_number(float(bound))}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_number(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+REFRESHES = Counter("parkingbot_calendar_refreshes_total", "Calendar page reloads (including browser recycles)")
+AVAILABILITY_CHECKS = Counter("parkingbot_availability_checks_total",
+                              "Checks of the target dates, by source (scan, watch or probe)", ["source"])
+STEP_EXCEPTIONS = Counter("parkingbot_step_exceptions_total",
+                          "Exceptions caught while running a step, by checkpoint state", ["step"])
+RETRIES = Counter("parkingbot_retries_total",
+                  "Retries after an exception: a calendar poll or a checkpoint recovery", ["kind"])
+BROWSER_RECYCLES = Counter("parkingbot_browser_recycles_total", "Browsers swapped for a fresh one mid-run")
+RESERVATIONS = Counter("parkingbot_reservations_total", "Finished reservation runs, by outcome", ["outcome"])
+PAGE_LOAD = Histogram("parkingbot_page_load_seconds", "Calendar page load time from the Navigation Timing entry",
+                      [0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30])
+CALENDAR_SCAN = Histogram("parkingbot_calendar_scan_seconds", "Time to scan the mounted calendar for the targets",
+                          [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5])
+DETECTION_TO_PAYMENT = Histogram("parkingbot_detection_to_payment_seconds",
+                                 "Time from clicking an open date to the verified payment",
+                                 [2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180])
+
+
+def render():
+    """Every instrument in the Prometheus text exposition format"""
+    lines = []
+    for instrument in _instruments:
+        lines.append(f"# HELP {instrument.name} {instrument.help}")
+        lines.append(f"# TYPE {instrument.name} {instrument.kind}")
+        lines.extend(instrument.samples())
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def write_file(path):
+    """Rewrite path with the current metrics; readers never see a half-written file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def _write_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_file(path)
+        except OSError:
+            pass
+
+
+def start(port=None, path=None, interval=None, log=None):
+    """Start the exporters configured by the arguments or METRICS_PORT/METRICS_FILE, once per process.
+
+    Returns a description of what is exported, or None.  An exporter that
+    can't start (e.g. the port is taken) is reported through log and skipped.
+    """
+    port = port if port is not None else int(os.getenv("METRICS_PORT") or 0)
+    path = path or os.getenv("METRICS_FILE")
+    interval = interval or float(os.getenv("METRICS_INTERVAL") or 15)
+    started = []
+    with _exporters_lock:
+        if port:
+            if "http" not in _exporters:
+                try:
+                    # Localhost only; the endpoint has no authentication
+                    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+                except OSError as e:
+                    server = None
+                    if log:
+                        log(f"Metrics endpoint not started on port {port}: {e}")
+                if server:
+                    server.daemon_threads = True
+                    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+                    _exporters["http"] = server
+            if "http" in _exporters:
+                started.append(f"http://127.0.0.1:{_exporters['http'].server_address[1]}/metrics")
+        if path:
+            if "file" not in _exporters:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                except OSError as e:
+                    path = None
+                    if log:
+                        log(f"Metrics file not written: {e}")
+                if path:
+                    threading.Thread(target=_write_periodically, args=(path, interval), name="metrics-file",
+                                     daemon=True).start()
+                    atexit.register(flush)
+                    _exporters["file"] = path
+            if "file" in _exporters:
+                started.append(_exporters["file"])
+    return ", ".join(started) or None
+
+
+def flush():
+    """Write the metrics file now (e.g. at the end of a run) if one is configured"""
+    path = _exporters.get("file")
+    if path:
+        try:
+            write_file(path)
+        except OSError:
+            pass
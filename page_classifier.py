@@ -0,0 +1,130 @@
+"""Tell which page of the reservation flow the browser is on.
+
+One script call returns the URL together with a handful of DOM markers, and
+identify() maps them to a page name.  The reservation loop uses this to jump
+to the handler for wherever the site actually landed (a redirect straight to
+the calendar, a skipped carpool step) instead of waiting out a step whose page
+never shows up.
+
+After the payment is confirmed, payment_outcome() checks in one call whether
+it went through (the receipt with the plate number), failed (visible error
+messages) or is still pending.
+"""
+from urllib.parse import urlsplit
+
+LOGIN = "login"
+DASHBOARD = "dashboard"
+CALENDAR = "calendar"
+CARPOOL = "carpool"
+CHECKOUT = "checkout"
+PURCHASE_CONFIRM = "purchase_confirm"
+POST_PURCHASE = "post_purchase"
+UNKNOWN = "unknown"
+
+POST_PURCHASE_MARKERS = ("post-purchase", "confirmation", "receipt", "success")
+
+PAYMENT_PENDING = "pending"
+PAYMENT_SUCCESS = "success"
+PAYMENT_ERROR = "error"
+
+# returns the URL and one flag per page marker, checked in a single round trip
+SIGNATURE_JS = """
+function visible(el) {
+    return !!el && el.getClientRects().length > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+}
+function byText(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+var calendarFrame = Array.prototype.some.call(document.querySelectorAll('iframe'), function (frame) {
+    var src = (frame.getAttribute('src') || '').toLowerCase();
+    return src.indexOf('doubleclick') === -1 && src.indexOf('analytics') === -1;
+});
+return {
+    url: window.location.href,
+    loginForm: !!document.getElementById('emailAddress'),
+    reserveLink: visible(byText("//div[contains(text(), 'Reserve a Parking Spot')]")),
+    calendar: !!document.querySelector('.mbsc-calendar-wrapper') || calendarFrame,
+    carpool: visible(byText("//div[starts-with(normalize-space(text()), '4+ Carpool')]")),
+    purchaseConfirm: visible(document.querySelector('.PurchaseConfirm--header')),
+    plate: visible(document.querySelector("[class*='ParkingSession_plate__']"))
+};
+"""
+
+
+def signature(driver):
+    return driver.execute_script(SIGNATURE_JS)
+
+
+def classify(marks, checkout_marker):
+    """Page name for a signature() result; checkout_marker is the Honk checkout URL fragment"""
+    url = marks.get("url") or ""
+    path = urlsplit(url).path.lower()
+    if marks.get("plate") or any(marker in path for marker in POST_PURCHASE_MARKERS):
+        return POST_PURCHASE
+    if marks.get("purchaseConfirm"):
+        return PURCHASE_CONFIRM
+    if checkout_marker in url:
+        return CHECKOUT
+    if marks.get("loginForm") or "login" in path:
+        return LOGIN
+    # Carpool options appear on the calendar page once a date is clicked
+    if marks.get("carpool"):
+        return CARPOOL
+    if marks.get("calendar"):
+        return CALENDAR
+    if marks.get("reserveLink"):
+        return DASHBOARD
+    return UNKNOWN
+
+
+def identify(driver, checkout_marker):
+    """Page the browser is on right now, or UNKNOWN (e.g. while a page is still rendering)"""
+    try:
+        return classify(signature(driver), checkout_marker)
+    except Exception:
+        return UNKNOWN
+
+
+# arguments: checkout URL, success URL markers; returns {state, url, plate, messages}
+PAYMENT_OUTCOME_JS = """
+var initialUrl = arguments[0], markers = arguments[1];
+function visible(el) {
+    return !!el && el.getClientRects().length > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+}
+function texts(nodes, accept) {
+    var found = [];
+    for (var i = 0; i < nodes.length && found.length < 5; i++) {
+        var text = visible(nodes[i]) ? (nodes[i].innerText || '').trim() : '';
+        if (text && found.indexOf(text) === -1 && (!accept || accept(text))) found.push(text.slice(0, 200));
+    }
+    return found;
+}
+var url = window.location.href;
+var path = window.location.pathname.toLowerCase();
+// A receipt page is a success even if a banner on it mentions an error (e.g. a stale toast)
+var onReceipt = url !== initialUrl && markers.some(function (marker) { return path.indexOf(marker) !== -1; });
+if (onReceipt) {
+    var plates = texts(document.querySelectorAll("[class*='ParkingSession_plate__']"));
+    var snapshot = document.evaluate(
+        "//*[contains(text(), 'Success') or contains(text(), 'Confirmed') or contains(text(), 'Thank you') or contains(text(), 'Receipt')]",
+        document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+    var messages = texts(nodes);
+    if (plates.length || messages.length) {
+        return {state: 'success', url: url, plate: plates[0] || null, messages: messages};
+    }
+}
+// Alerts and banners also carry news, promos and form hints; only count the ones that read like a failure
+var failure = /fail|error|declin|denied|invalid|unable|problem|try again/i;
+var errors = texts(document.querySelectorAll("[role='alert'], [class*='error'], [class*='alert'], [class*='notification']"),
+                   function (text) { return failure.test(text); });
+if (errors.length) return {state: 'error', url: url, plate: null, messages: errors};
+return {state: 'pending', url: url, plate: null, messages: []};
+"""
+
+
+def payment_outcome(driver, initial_url):
+    """{state: PAYMENT_PENDING/SUCCESS/ERROR, url, plate, messages} after the payment was confirmed on initial_url"""
+    return driver.execute_script(PAYMENT_OUTCOME_JS, initial_url,
+                                 list(POST_PURCHASE_MARKERS) + ["parking-reservation/"])
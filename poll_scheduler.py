@@ -0,0 +1,120 @@
+"""How long to wait before the next calendar refresh.
+
+select_date used to sleep a constant interval between refreshes and a fixed
+five seconds after any error.  A PollScheduler is told how each poll went and
+picks the next delay: the base interval normally, a shorter one inside a hot
+window (e.g. around a release), exponential backoff after errors or slow
+loads, and a circuit breaker that holds off for a cooldown once the server
+answers 429/5xx or page loads keep timing out.  Every delay gets a little
+random jitter so refreshes don't land on a fixed beat.  Each decision is
+logged with its reason so intervals can be tuned from the run log.
+"""
+import random
+import time
+
+OK = "ok"
+ERROR = "error"
+SLOW = "slow"
+PRESSURE = "pressure"
+TIMEOUT = "timeout"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def classify(status=None, load_ms=None, error=None, slow_ms=5000):
+    """Outcome of one poll from its HTTP status, load time and exception (if any)"""
+    if status == 429 or (status is not None and status >= 500):
+        return PRESSURE
+    if error is not None:
+        return TIMEOUT if type(error).__name__ == "TimeoutException" else ERROR
+    if load_ms is not None and load_ms > slow_ms:
+        return SLOW
+    return OK
+
+
+class PollScheduler:
+    """Picks the delay before each refresh from the outcomes of the previous polls"""
+
+    def __init__(self, interval, hot_window=None, hot_interval=None, max_interval=120, backoff=2.0,
+                 jitter=0.2, slow_ms=5000, breaker_threshold=3, breaker_cooldown=60, log=None):
+        self.interval = interval
+        # (start, end) epochs during which hot_interval is used instead of interval
+        self.hot_window = hot_window
+        self.hot_interval = hot_interval if hot_interval is not None else interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.slow_ms = slow_ms
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.log = log
+        self.failures = 0
+        self.pressure = 0
+        self.breaker = CLOSED
+        self.breaker_until = 0.0
+        self.decisions = []
+
+    def in_hot_window(self, now=None):
+        if not self.hot_window:
+            return False
+        now = time.time() if now is None else now
+        return self.hot_window[0] <= now <= self.hot_window[1]
+
+    def record(self, status=None, load_ms=None, error=None):
+        """Feed in one poll's result; returns its outcome"""
+        outcome = classify(status, load_ms, error, self.slow_ms)
+        if outcome == OK:
+            self.failures = 0
+            self.pressure = 0
+            if self.breaker == HALF_OPEN:
+                self.breaker = CLOSED
+                self._log("Poll scheduler: server recovered, circuit breaker closed")
+            return outcome
+        self.failures += 1
+        if outcome in (PRESSURE, TIMEOUT):
+            self.pressure += 1
+            # One more pressure signal after the cooldown re-opens the breaker straight away
+            if self.breaker == HALF_OPEN or self.pressure >= self.breaker_threshold:
+                self.breaker = OPEN
+                self.breaker_until = time.time() + self.breaker_cooldown
+                self._log(f"Poll scheduler: circuit breaker open for {self.breaker_cooldown}s "
+                          f"after {self.pressure} x {outcome} (status {status})")
+        elif self.breaker == HALF_OPEN:
+            # The server answered; ordinary backoff covers whatever else went wrong
+            self.breaker = CLOSED
+        return outcome
+
+    def next_delay(self, now=None):
+        """(delay seconds, reason) before the next refresh"""
+        now = time.time() if now is None else now
+        if self.breaker == OPEN:
+            if now < self.breaker_until:
+                return self._jittered(self.breaker_until - now), "circuit breaker open"
+            self.breaker = HALF_OPEN
+        hot = self.in_hot_window(now)
+        base = self.hot_interval if hot else self.interval
+        reason = "hot window" if hot else "base interval"
+        if self.breaker == HALF_OPEN:
+            # The cooldown was the backoff; probe once at the normal cadence
+            reason += ", breaker half-open"
+        elif self.failures:
+            base = min(base * self.backoff ** self.failures, self.max_interval)
+            reason += f", backoff x{self.backoff ** self.failures:g} after {self.failures} failed/slow polls"
+        return self._jittered(base), reason
+
+    def wait(self):
+        """Sleep for the next delay and log the decision; returns the delay"""
+        delay, reason = self.next_delay()
+        self.decisions.append({"at": time.time(), "delay": round(delay, 3), "reason": reason})
+        self._log(f"Poll scheduler: next refresh in {delay:.2f}s ({reason})")
+        time.sleep(delay)
+        return delay
+
+    def _jittered(self, delay):
+        return max(delay * (1 + random.uniform(-self.jitter, self.jitter)), 0)
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
@@ -0,0 +1,98 @@
+"""Release-time scheduling with server clock-offset calibration.
+
+Instead of polling from the moment the bot starts, a ReleaseSchedule has the
+bot log in a configurable lead time before the release, park on the calendar,
+measure how far the local clock is from the server's Date header, and only
+poll densely in a short window around the corrected release moment.
+"""
+import time
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.request import Request, urlopen
+
+RELEASE_TIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%H:%M:%S", "%H:%M"]
+
+
+def parse_release_time(text):
+    """Parse 'HH:MM[:SS]' (next occurrence) or 'YYYY-MM-DD HH:MM[:SS]' local time into an epoch"""
+    text = text.strip().replace("T", " ")
+    for fmt in RELEASE_TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt:
+            now = datetime.now()
+            parsed = now.replace(hour=parsed.hour, minute=parsed.minute, second=parsed.second, microsecond=0)
+            if parsed <= now:
+                parsed += timedelta(days=1)
+        return parsed.timestamp()
+    raise ValueError(f"Unrecognised release time: {text!r}")
+
+
+def measure_clock_offset(url, samples=5, timeout=5):
+    """Estimate server clock minus local clock from Date headers.
+
+    Returns (offset_seconds, uncertainty_seconds) from the sample with the
+    shortest round trip.  The Date header only has whole-second resolution, so
+    half a second is added to centre the estimate within that second.
+    """
+    best = None
+    for _ in range(samples):
+        sent = time.time()
+        with urlopen(Request(url, method="HEAD"), timeout=timeout) as response:
+            date_header = response.headers.get("Date")
+        received = time.time()
+        if not date_header:
+            continue
+        server_time = parsedate_to_datetime(date_header).timestamp() + 0.5
+        rtt = received - sent
+        if best is None or rtt < best[1]:
+            best = (server_time - (sent + received) / 2, rtt)
+    if best is None:
+        raise Exception(f"No Date header returned by {url}")
+    offset, rtt = best
+    return offset, 0.5 + rtt / 2
+
+
+class ReleaseSchedule:
+    """When to stage the session and when to poll densely around a release"""
+
+    def __init__(self, release_at, lead_time=300, window_before=20, window_after=120, dense_interval=0.5):
+        self.release_at = release_at
+        self.lead_time = lead_time
+        self.window_before = window_before
+        self.window_after = window_after
+        self.dense_interval = dense_interval
+        self.clock_offset = 0.0
+
+    def local_release(self):
+        """Release moment on the local clock, corrected by the measured server offset"""
+        return self.release_at - self.clock_offset
+
+    def stage_at(self):
+        return self.local_release() - self.lead_time
+
+    def window_start(self):
+        return self.local_release() - self.window_before
+
+    def window_end(self):
+        return self.local_release() + self.window_after
+
+    def dense_attempts(self):
+        """Polls needed to cover the window at the dense interval"""
+        return max(int((self.window_end() - max(time.time(), self.window_start())) / self.dense_interval), 1)
+
+    def calibrate(self, url):
+        self.clock_offset, uncertainty = measure_clock_offset(url)
+        return self.clock_offset, uncertainty
+
+    @staticmethod
+    def sleep_until(moment):
+        remaining = moment - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @staticmethod
+    def describe(moment):
+        return datetime.fromtimestamp(moment).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
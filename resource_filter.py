@@ -0,0 +1,124 @@
+"""Block network resources the bot never uses, and measure what each page load costs.
+
+Every calendar refresh otherwise re-downloads images, fonts, media and ad or
+analytics scripts.  A ResourceProfile turns resource types and tracker
+domains into wildcard patterns for CDP Network.setBlockedURLs, which Chrome
+applies to every frame of the page.  That command has no exceptions, so the
+allowlist works on domains: an allowed domain is never put on the tracker
+list, and a resource type the calendar or checkout does need can simply be
+left out of block_types.
+"""
+import os
+
+TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.bmp"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.mov"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+}
+TRACKER_DOMAINS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "mixpanel.com",
+    "fullstory.com",
+    "intercom.io",
+    "clarity.ms",
+    "tiktok.com",
+]
+# Payment and calendar dependencies that must keep loading even if a tracker list grows to cover them
+DEFAULT_ALLOWED_DOMAINS = ["stripe.com", "stripe.network", "mobiscroll.com", "honkmobile.com", "parkbrightonresort.com"]
+
+# One script call: navigation timing and HTTP status plus bytes and requests for everything the page loaded so far
+PAGE_LOAD_STATS_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var bytes = nav ? nav.transferSize : 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+return {
+    load_ms: nav ? Math.round(nav.loadEventEnd || nav.duration) : null,
+    status: nav && nav.responseStatus ? nav.responseStatus : null,
+    bytes: bytes,
+    requests: resources.length + (nav ? 1 : 0)
+};
+"""
+
+
+class ResourceProfile:
+    """Which resource types and tracker domains to block"""
+
+    def __init__(self, name, block_types=("image", "media", "font"), block_trackers=True,
+                 allowed_domains=DEFAULT_ALLOWED_DOMAINS, extra_patterns=()):
+        self.name = name
+        self.block_types = tuple(block_types)
+        self.block_trackers = block_trackers
+        self.allowed_domains = list(allowed_domains)
+        self.extra_patterns = list(extra_patterns)
+
+    def blocked_patterns(self):
+        patterns = []
+        for resource_type in self.block_types:
+            for pattern in TYPE_PATTERNS[resource_type]:
+                # Match with and without a query string
+                patterns += [pattern, pattern + "?*"]
+        if self.block_trackers:
+            for domain in TRACKER_DOMAINS:
+                if not any(domain == allowed or domain.endswith("." + allowed) for allowed in self.allowed_domains):
+                    patterns.append(f"*://*.{domain}/*")
+                    patterns.append(f"*://{domain}/*")
+        return patterns + self.extra_patterns
+
+    def apply(self, driver):
+        """Install the blocklist on this browser; returns the number of patterns"""
+        patterns = self.blocked_patterns()
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        return len(patterns)
+
+
+PROFILES = {
+    "off": None,
+    "trackers": ResourceProfile("trackers", block_types=()),
+    "lean": ResourceProfile("lean"),
+}
+DEFAULT_PROFILE = "lean"
+
+
+def get_profile(name=None):
+    """Profile by name, defaulting to the RESOURCE_PROFILE environment variable, then 'lean'"""
+    name = name or os.getenv("RESOURCE_PROFILE") or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown resource profile {name!r}, expected one of {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def clear(driver):
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+
+
+def page_load_stats(driver):
+    """Load time in ms, HTTP status, bytes transferred and request count for the current document"""
+    return driver.execute_script(PAGE_LOAD_STATS_JS)
+
+
+def format_bytes(count):
+    if count >= 1024 * 1024:
+        return f"{count / (1024 * 1024):.1f} MB"
+    return f"{count / 1024:.0f} KB"
+
+
+def summarize(loads):
+    """Averages over a list of page_load_stats results"""
+    timed = [load["load_ms"] for load in loads if load.get("load_ms") is not None]
+    return {
+        "loads": len(loads),
+        "avg_load_ms": round(sum(timed) / len(timed)) if timed else None,
+        "avg_bytes": sum(load["bytes"] for load in loads) / len(loads) if loads else 0,
+    }
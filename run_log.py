@@ -0,0 +1,144 @@
+"""Bounded, process-wide buffer of structured log records.
+
+The buffer lives at module level rather than in Streamlit's session state, so
+the background reservation thread can write to it without a script context,
+and a page reload (which starts a new session) still sees the history.  Every
+record gets an increasing sequence number; readers keep a cursor and only
+fetch what they have not seen yet.
+"""
+import re
+import threading
+from collections import deque
+from datetime import datetime
+
+LEVELS = ("debug", "info", "warning", "error")
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+class LogBuffer:
+    """Ring buffer of {seq, timestamp, level, step, message} records"""
+
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def set_step_source(self, source):
+        """Register a callable returning the current step name for records written from this thread"""
+        self._local.step_source = source
+
+    def _current_step(self):
+        source = getattr(self._local, "step_source", None)
+        return source() if source else None
+
+    def append(self, message, level="info", step=None):
+        record = {
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            "level": level if level in LEVELS else "info",
+            "step": step or self._current_step(),
+            "message": message,
+        }
+        with self._lock:
+            record["seq"] = self._next_seq
+            self._next_seq += 1
+            self._records.append(record)
+        return record
+
+    def read(self, cursor=0, limit=None):
+        """Return (records with seq >= cursor, next cursor).
+
+        Records that already fell out of the buffer are skipped; compare the
+        first record's seq with the cursor to tell how many were missed.
+        """
+        with self._lock:
+            if not self._records:
+                return [], max(cursor, self._next_seq)
+            start = max(cursor - self._records[0]["seq"], 0)
+            records = [self._records[i] for i in range(start, len(self._records))]
+        if limit is not None:
+            records = records[:limit]
+        next_cursor = records[-1]["seq"] + 1 if records else max(cursor, self._next_seq)
+        return records, next_cursor
+
+    def cursor(self):
+        """Cursor positioned after the newest record"""
+        with self._lock:
+            return self._next_seq
+
+
+class LogTail:
+    """One reader's view of the buffer with repeated poll messages collapsed.
+
+    Records are folded in as they arrive: one whose message matches a recent
+    entry once numbers are ignored ("Date ... not available yet.
+    Refreshing...", "Poll scheduler: next refresh in 1.93s", page load
+    timings) bumps that entry's counter instead of adding a line, so a long
+    polling run stays a handful of entries.  Warnings and errors are never
+    collapsed.
+    """
+
+    DIGITS = re.compile(r"\d+(\.\d+)?")
+
+    def __init__(self, capacity=2000, lookback=6):
+        self.capacity = capacity
+        # how many of the newest entries a repeated message may be folded into
+        self.lookback = lookback
+        self.entries = deque(maxlen=capacity)
+        self.cursor = 0
+        self.missed = 0
+
+    def key(self, record):
+        return (record["level"], record["step"], self.DIGITS.sub("#", record["message"]))
+
+    def update(self, buffer):
+        """Fold in the records this tail has not seen yet; returns how many arrived"""
+        records, next_cursor = buffer.read(self.cursor)
+        if records and records[0]["seq"] > self.cursor:
+            self.missed += records[0]["seq"] - self.cursor
+        self.cursor = next_cursor
+        for record in records:
+            self.add(record)
+        return len(records)
+
+    def add(self, record):
+        if record["level"] in ("info", "debug"):
+            key = self.key(record)
+            for i in range(1, min(self.lookback, len(self.entries)) + 1):
+                entry = self.entries[-i]
+                if entry["key"] == key:
+                    entry["count"] += 1
+                    entry["last"] = record
+                    return
+        self.entries.append({"key": self.key(record), "first": record, "last": record, "count": 1})
+
+    def window(self, size, page=0):
+        """Up to size entries, newest last, page pages back from the end; returns (entries, older hidden)"""
+        end = max(len(self.entries) - size * page, 0)
+        start = max(end - size, 0)
+        return [self.entries[i] for i in range(start, end)], start
+
+
+def format_entry(entry):
+    """One line for a LogTail entry; collapsed ones show the latest message and the repeat count"""
+    line = format_record(entry["last"])
+    if entry["count"] > 1:
+        line += f"  (x{entry['count']} since {entry['first']['timestamp'][11:19]})"
+    return line
+
+
+def format_record(record):
+    step = f" [{record['step']}]" if record["step"] else ""
+    return f"[{record['timestamp']}]{step} {record['message']}"
+
+
+def get_log_buffer(capacity=2000):
+    """The process-wide buffer; capacity is only used by the first caller"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = LogBuffer(capacity)
+        return _buffer
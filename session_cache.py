@@ -0,0 +1,147 @@
+"""Encrypted on-disk cache of authenticated browser sessions.
+
+After a successful login the cookies for the reservation and Honk sites, and
+the localStorage of each visited origin, are written to a Fernet-encrypted
+file.  The next run restores them into a fresh browser before the first page
+load, so a single navigation is enough to tell whether login can be skipped.
+
+The key comes from the SESSION_CACHE_KEY environment variable, or is generated
+once into a 0600 key file next to the cache.  Entries are looked up by an HMAC
+of the username and password, so a session is only restored for someone who
+knows the account's password, and the file never reveals which accounts it
+holds.  The HMAC key is derived from the cache key with HKDF, so encryption and
+entry names don't share a secret.
+"""
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".parkingbot")
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+RESTORE_STORAGE_JS = """
+(function () {
+    var saved = %s;
+    var items = saved[window.location.origin];
+    if (!items) return;
+    for (var key in items) {
+        if (window.localStorage.getItem(key) === null) {
+            window.localStorage.setItem(key, items[key]);
+        }
+    }
+})();
+"""
+
+
+class SessionCache:
+    """Per-account cookies and localStorage, encrypted at rest"""
+
+    def __init__(self, path=None, key=None, max_age=12 * 3600):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "session.bin")
+        self.max_age = max_age
+        key = key or os.getenv("SESSION_CACHE_KEY") or self._load_or_create_key()
+        self.key = key.encode("ascii") if isinstance(key, str) else key
+        self.fernet = Fernet(self.key)
+        self.account_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+                                info=b"parkingbot session cache account id").derive(self.key)
+        self._storage_script = None
+
+    def _load_or_create_key(self):
+        key_path = os.path.join(os.path.dirname(self.path), "session.key")
+        if os.path.exists(key_path):
+            with open(key_path, "rb") as f:
+                return f.read().strip()
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        key = Fernet.generate_key()
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _account(self, username, password):
+        login = f"{username.strip().lower()}\0{password}".encode("utf-8")
+        return hmac.new(self.account_key, login, hashlib.sha256).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(self.fernet.decrypt(f.read()))
+        except (OSError, InvalidToken, ValueError):
+            return {"accounts": {}}
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.fernet.encrypt(json.dumps(data).encode("utf-8")))
+        os.replace(tmp_path, self.path)
+
+    def load(self, username, password):
+        """Return the saved entry for these credentials, or None if missing or expired"""
+        entry = self._read()["accounts"].get(self._account(username, password))
+        if not entry or time.time() - entry.get("saved_at", 0) > self.max_age:
+            return None
+        now = time.time()
+        entry["cookies"] = [c for c in entry["cookies"] if c.get("expires", -1) <= 0 or c["expires"] > now]
+        return entry if entry["cookies"] else None
+
+    def save(self, driver, username, password, domains):
+        """Snapshot cookies for domains plus the current origin's localStorage"""
+        data = self._read()
+        account = self._account(username, password)
+        entry = data["accounts"].get(account) or {"local_storage": {}}
+
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        entry["cookies"] = [
+            {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+            for cookie in cookies
+            if any(cookie["domain"].lstrip(".").endswith(domain) for domain in domains)
+        ]
+        storage = driver.execute_script(
+            "return {origin: window.location.origin, items: Object.assign({}, window.localStorage)};"
+        )
+        if storage and storage["items"]:
+            entry["local_storage"][storage["origin"]] = storage["items"]
+        entry["saved_at"] = time.time()
+
+        data["accounts"][account] = entry
+        self._write(data)
+        return len(entry["cookies"])
+
+    def restore(self, driver, username, password):
+        """Load a saved session into the browser before any page loads; True if one was found"""
+        entry = self.load(username, password)
+        if not entry:
+            return False
+        cookies = []
+        for cookie in entry["cookies"]:
+            cookie = dict(cookie)
+            if cookie.get("expires", -1) <= 0:
+                cookie.pop("expires", None)
+            cookies.append(cookie)
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        if entry.get("local_storage"):
+            self._storage_script = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": RESTORE_STORAGE_JS % json.dumps(entry["local_storage"])
+            })["identifier"]
+        return True
+
+    def clear(self, driver):
+        """Undo a restore that turned out to be stale so login starts from a clean browser"""
+        if self._storage_script:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": self._storage_script})
+            self._storage_script = None
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_script("window.localStorage.clear();")
+
+    def forget(self, username, password):
+        data = self._read()
+        if data["accounts"].pop(self._account(username, password), None) is not None:
+            self._write(data)
@@ -0,0 +1,455 @@
+"""Local stand-in for the reservenski and Honk sites.
+
+Reproduces just enough of the real pages (login form, dashboard link,
+Mobiscroll calendar, carpool option, checkout button and the PurchaseConfirm
+dialog) for ReserveDate to run its full flow offline.  The reservenski pages
+are served on 127.0.0.1 and the Honk pages on localhost so the two sites keep
+separate cookie jars, just like the real ones.
+
+    python standin_server.py --port 8765 --available 15,16
+"""
+import argparse
+import calendar
+import json
+import re
+import secrets
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CARPOOL_TEXT = "4+ Carpool (Occupancy will be verified by Parking Ambassador upon arrival)"
+AVAILABLE_COLOR = "rgba(49, 200, 25, 0.2)"
+# Decorative assets every page pulls in, sized like the real sites' hero image and web font
+STATIC_ASSETS = {
+    "/static/hero.jpg": ("image/jpeg", 250 * 1024),
+    "/static/brand.woff2": ("font/woff2", 60 * 1024),
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+@font-face {{ font-family: Brand; src: url(/static/brand.woff2) format("woff2"); }}
+body {{ font-family: Brand, sans-serif; margin: 2rem; }}
+.hero {{ width: 100%; height: 120px; object-fit: cover; }}
+.mbsc-calendar-wrapper {{ width: 420px; }}
+.mbsc-calendar-header {{ display: flex; justify-content: space-between; align-items: center; }}
+.mbsc-calendar-row {{ display: flex; }}
+.mbsc-calendar-cell {{ width: 60px; height: 48px; cursor: pointer; }}
+.mbsc-calendar-day-outer .mbsc-calendar-day-text {{ color: #999; }}
+.mbsc-calendar-day-text {{ display: inline-block; padding: 6px; border-radius: 50%; }}
+.slot-open .mbsc-calendar-day-text {{ background-color: {available_color}; }}
+.option {{ padding: 0.5rem; margin: 0.25rem 0; border: 1px solid #ccc; cursor: pointer; }}
+.option.selected {{ border-color: #1E90FF; }}
+.PurchaseConfirm {{ position: fixed; top: 20%; left: 30%; padding: 2rem; background: white; border: 1px solid #333; }}
+</style>
+<script>window.SITE = {site_json};</script>
+</head>
+<body>
+<img class="hero" src="/static/hero.jpg" alt="">
+{body}
+</body>
+</html>
+"""
+
+LOGIN_BODY = """
+<form method="post" action="/login">
+  <label>Email <input id="emailAddress" name="emailAddress" type="email"></label>
+  <label>Password <input id="password" name="password" type="password"></label>
+  <button class="Login_submitButton__fMHAq" type="submit">Login</button>
+</form>
+"""
+
+DASHBOARD_BODY = """
+<h1>Welcome back</h1>
+<div class="DashboardLink" onclick="window.location.href = '/reserve'">Reserve a Parking Spot</div>
+"""
+
+CALENDAR_BODY = """
+<div id="app">Loading...</div>
+<div id="options" hidden>
+  <div class="option">Standard (Single Occupancy)</div>
+  <div class="option" id="carpool">""" + CARPOOL_TEXT + """</div>
+</div>
+<div class="ui basic center aligned segment" id="pay" hidden>
+  <button class="ui primary button" id="pay-button"><div>Pay $10.00 &amp; Park</div></button>
+</div>
+<script>
+(function () {
+  var MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+                "August", "September", "October", "November", "December"];
+  var DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"];
+  var selected = null;
+  var view = null;
+
+  function iso(d) {
+    var m = String(d.getMonth() + 1).padStart(2, "0");
+    var day = String(d.getDate()).padStart(2, "0");
+    return d.getFullYear() + "-" + m + "-" + day;
+  }
+
+  function monthKey(year, month) {
+    return year + "-" + String(month + 1).padStart(2, "0");
+  }
+
+  function render(year, month) {
+    view = {year: year, month: month};
+    var first = new Date(year, month, 1);
+    var cursor = new Date(year, month, 1 - first.getDay());
+    var html = '<div class="mbsc-calendar-wrapper">' +
+      '<div class="mbsc-calendar-header">' +
+      '<button class="mbsc-calendar-button mbsc-calendar-button-prev">&lsaquo;</button>' +
+      '<div class="mbsc-calendar-title">' + MONTHS[month] + ' ' + year + '</div>' +
+      '<button class="mbsc-calendar-button mbsc-calendar-button-next">&rsaquo;</button>' +
+      '</div><div class="mbsc-calendar-table">';
+    for (var week = 0; week < 6; week++) {
+      html += '<div class="mbsc-calendar-row">';
+      for (var i = 0; i < 7; i++) {
+        var key = iso(cursor);
+        var classes = "mbsc-calendar-cell mbsc-calendar-day";
+        if (cursor.getMonth() !== month) classes += " mbsc-calendar-day-outer";
+        if (SITE.available.indexOf(key) !== -1) classes += " slot-open";
+        var label = DAYS[cursor.getDay()] + ", " + MONTHS[cursor.getMonth()] + " " +
+          cursor.getDate() + ", " + cursor.getFullYear();
+        html += '<div class="' + classes + '" data-date="' + key + '" aria-label="' + label + '">' +
+          '<div class="mbsc-calendar-cell-inner">' +
+          '<div class="mbsc-calendar-cell-text mbsc-calendar-day-text">' + cursor.getDate() + '</div>' +
+          '</div></div>';
+        cursor.setDate(cursor.getDate() + 1);
+      }
+      html += '</div>';
+    }
+    html += '</div></div>';
+    document.getElementById("app").innerHTML = html;
+  }
+
+  document.addEventListener("click", function (event) {
+    // Month paging re-renders in place, like the widget's own header buttons
+    var step = event.target.closest(".mbsc-calendar-button-next") ? 1 :
+      event.target.closest(".mbsc-calendar-button-prev") ? -1 : 0;
+    if (step && view) {
+      var target = new Date(view.year, view.month + step, 1);
+      render(target.getFullYear(), target.getMonth());
+      loadMonth(monthKey(view.year, view.month));
+      return;
+    }
+    var cell = event.target.closest(".mbsc-calendar-cell");
+    if (cell && cell.classList.contains("slot-open")) {
+      selected = cell.getAttribute("data-date");
+      document.getElementById("options").hidden = false;
+      return;
+    }
+    var option = event.target.closest(".option");
+    if (option) {
+      document.querySelectorAll(".option").forEach(function (o) { o.classList.remove("selected"); });
+      option.classList.add("selected");
+      document.getElementById("pay").hidden = option.id !== "carpool";
+      return;
+    }
+    if (event.target.closest("#pay-button") && selected) {
+      window.location.href = SITE.honk + "/checkout?date=" + selected + "&carpool=1";
+    }
+  });
+
+  function applyAvailability(data) {
+    SITE.available = SITE.available.filter(function (d) {
+      return d.slice(0, 7) !== data.month;
+    }).concat(data.available);
+    document.querySelectorAll(".mbsc-calendar-cell").forEach(function (cell) {
+      cell.classList.toggle("slot-open", SITE.available.indexOf(cell.getAttribute("data-date")) !== -1);
+    });
+  }
+
+  // Availability for one month comes from the same JSON endpoint the real SPA calls
+  function loadMonth(key) {
+    return fetch("/api/availability?month=" + key, {credentials: "include"})
+      .then(function (response) { return response.json(); })
+      .then(applyAvailability)
+      .catch(function () {});
+  }
+
+  // The real calendar mounts after the SPA finishes its own data requests.
+  setTimeout(function () {
+    loadMonth(SITE.month).then(function () {
+      var parts = SITE.month.split("-");
+      render(parseInt(parts[0], 10), parseInt(parts[1], 10) - 1);
+    });
+  }, SITE.renderDelayMs);
+
+  // Keep availability current in-page, the way the live SPA updates without a reload
+  if (SITE.liveUpdateMs > 0) {
+    setInterval(function () {
+      if (view) loadMonth(monthKey(view.year, view.month));
+    }, SITE.liveUpdateMs);
+  }
+})();
+</script>
+"""
+
+CHECKOUT_BODY = """
+<h1>Checkout</h1>
+<div class="ui basic center aligned segment">
+  <button class="ui primary button" id="pay-button"><div>Pay $10.00 &amp; Park</div></button>
+</div>
+<script>
+document.getElementById("pay-button").addEventListener("click", function () {
+  if (document.querySelector(".PurchaseConfirm")) return;
+  var dialog = document.createElement("div");
+  dialog.className = "PurchaseConfirm";
+  dialog.innerHTML = '<h1 class="PurchaseConfirm--header">Does this look right?</h1>' +
+    '<div class="PurchaseConfirm--plate">' + SITE.plate + '</div>' +
+    '<button class="oGMkMQAoYbD7f3oxRBJI ButtonComponent">Confirm</button>';
+  document.body.appendChild(dialog);
+  dialog.querySelector("button").addEventListener("click", function () {
+    var params = new URLSearchParams(window.location.search);
+    fetch("/api/purchase", {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({date: params.get("date"), carpool: params.get("carpool") === "1"})
+    }).then(function (response) { return response.json(); }).then(function (result) {
+      window.location.href = "/parking-reservation/post-purchase?id=" + result.id;
+    });
+  });
+});
+</script>
+"""
+
+POST_PURCHASE_BODY = """
+<h1>Thank you for your purchase</h1>
+<div class="ParkingSession_plate__q3j4i">{plate}</div>
+"""
+
+
+class StandInSite:
+    """In-process HTTP server mimicking the reservation flow"""
+
+    def __init__(self, host="127.0.0.1", port=0, available_days=None, month=None,
+                 latency=0.0, render_delay=0.3, live_update=1.0, plate="ABC123", honk_host="localhost",
+                 clock_skew=0.0):
+        today = date.today()
+        self.month = month or date(today.year, today.month, 1)
+        self.available = set()
+        self.scheduled = []
+        self.clock_skew = clock_skew
+        self.release(*(available_days or []))
+        self.latency = latency
+        self.render_delay = render_delay
+        self.live_update = live_update
+        self.plate = plate
+        self.host = host
+        self.honk_host = honk_host
+        self.sessions = set()
+        self.purchases = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = self
+        self.port = self.httpd.server_address[1]
+        self.thread = None
+
+    def url(self, path="/"):
+        return f"http://{self.host}:{self.port}{path}"
+
+    def honk_url(self, path="/"):
+        return f"http://{self.honk_host}:{self.port}{path}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def release(self, *days):
+        """Make days (dates or days of the displayed month) available"""
+        for day in days:
+            self.available.add(day if isinstance(day, date) else self.month.replace(day=int(day)))
+
+    def schedule_release(self, days, at):
+        """Release days once the server clock (local time plus clock_skew) reaches epoch at"""
+        for day in days:
+            self.scheduled.append((at, day if isinstance(day, date) else self.month.replace(day=int(day))))
+
+    def now(self):
+        return time.time() + self.clock_skew
+
+    def available_dates(self, month=None):
+        """ISO dates open now, optionally only those in month ('YYYY-MM')"""
+        now = self.now()
+        released = {day for at, day in self.scheduled if at <= now}
+        return sorted(d.isoformat() for d in self.available | released if not month or d.isoformat()[:7] == month)
+
+    def unavailable_dates(self, month):
+        """ISO dates of month ('YYYY-MM') that are sold out, as the live feed lists them next to the open ones"""
+        year, number = (int(part) for part in month.split("-"))
+        open_now = set(self.available_dates(month))
+        days = (date(year, number, day).isoformat() for day in range(1, calendar.monthrange(year, number)[1] + 1))
+        return [day for day in days if day not in open_now]
+
+    def site_data(self):
+        return {
+            "month": self.month.strftime("%Y-%m"),
+            "available": self.available_dates(),
+            "renderDelayMs": int(self.render_delay * 1000),
+            "liveUpdateMs": int(self.live_update * 1000),
+            "honk": self.honk_url("").rstrip("/"),
+            "plate": self.plate,
+        }
+
+    def render(self, title, body):
+        return PAGE_TEMPLATE.format(
+            title=title,
+            available_color=AVAILABLE_COLOR,
+            site_json=json.dumps(self.site_data()),
+            body=body,
+        )
+
+    def record_purchase(self, payload):
+        with self.lock:
+            purchase = {
+                "id": len(self.purchases) + 1,
+                "date": payload.get("date"),
+                "carpool": bool(payload.get("carpool")),
+                "at": datetime.now().isoformat(),
+            }
+            self.purchases.append(purchase)
+            return purchase
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def site(self):
+        return self.server.site
+
+    def log_message(self, format, *args):
+        pass
+
+    def date_time_string(self, timestamp=None):
+        # Date headers follow the (optionally skewed) server clock for offset calibration
+        return super().date_time_string(self.site.now() if timestamp is None else timestamp)
+
+    def _session(self):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "session" and value in self.site.sessions:
+                return value
+        return None
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _redirect(self, location, headers=None):
+        self._send(303, headers=dict(headers or {}, Location=location))
+
+    def _json(self, payload, status=200):
+        self._send(status, json.dumps(payload), content_type="application/json")
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/":
+            self._redirect("/dashboard" if self._session() else "/login")
+        elif path == "/login":
+            self._send(200, self.site.render("Login", LOGIN_BODY))
+        elif path == "/dashboard":
+            if not self._session():
+                return self._redirect("/login")
+            self._send(200, self.site.render("Dashboard", DASHBOARD_BODY))
+        elif path == "/reserve":
+            if not self._session():
+                return self._redirect("/login")
+            self._send(200, self.site.render("Reserve", CALENDAR_BODY))
+        elif path in STATIC_ASSETS:
+            content_type, size = STATIC_ASSETS[path]
+            self._send(200, bytes(size), content_type=content_type)
+        elif path == "/api/availability":
+            if not self._session():
+                return self._json({"error": "unauthorized"}, status=401)
+            month = parse_qs(urlsplit(self.path).query).get("month", [self.site.month.strftime("%Y-%m")])[0]
+            if not re.fullmatch(r"\d{4}-\d{2}", month):
+                return self._json({"error": "month must be YYYY-MM"}, status=400)
+            self._json({"month": month, "available": self.site.available_dates(month),
+                        "unavailable": self.site.unavailable_dates(month)})
+        elif path == "/checkout":
+            self._send(200, self.site.render("Checkout", CHECKOUT_BODY))
+        elif path == "/parking-reservation/post-purchase":
+            self._send(200, self.site.render("Receipt", POST_PURCHASE_BODY.format(plate=self.site.plate)))
+        else:
+            self._send(404, "Not found", content_type="text/plain")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        if path == "/login":
+            form = {k: v[0] for k, v in parse_qs(raw).items()}
+            if not form.get("emailAddress") or not form.get("password"):
+                return self._send(200, self.site.render("Login", LOGIN_BODY))
+            token = secrets.token_hex(16)
+            self.site.sessions.add(token)
+            self._redirect("/dashboard", {"Set-Cookie": f"session={token}; Path=/; HttpOnly"})
+        elif path == "/api/purchase":
+            self._json(self.site.record_purchase(json.loads(raw or "{}")))
+        else:
+            self._send(404, "Not found", content_type="text/plain")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the local stand-in reservation site")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--available", default="15", help="Comma separated days of the current month")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--release-in", type=float,
+                        help="Keep the --available days closed until this many seconds after startup")
+    parser.add_argument("--clock-skew", type=float, default=0.0,
+                        help="Seconds the server clock (and its Date header) runs ahead of this machine")
+    args = parser.parse_args()
+
+    days = [int(d) for d in args.available.split(",") if d.strip()]
+    site = StandInSite(args.host, args.port, latency=args.latency, clock_skew=args.clock_skew)
+    if args.release_in is None:
+        site.release(*days)
+    else:
+        release_at = site.now() + args.release_in
+        site.schedule_release(days, release_at)
+        print(f"Days {days} release at server time {datetime.fromtimestamp(release_at):%H:%M:%S}")
+    print(f"Stand-in site running at {site.url('/login')} (checkout on {site.honk_url('/checkout')})")
+    try:
+        site.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
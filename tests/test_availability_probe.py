@@ -0,0 +1,31 @@
+import json
+from urllib.request import Request, urlopen
+
+import availability_probe
+from standin_server import StandInSite
+
+
+def test_open_dates_ignores_unavailable_lists():
+    payload = {"unavailable": ["2026-11-15"], "unavailableDates": ["2026-11-17"], "available": ["2026-11-16"]}
+    assert availability_probe.open_dates(payload) == {"2026-11-16"}
+
+
+def test_open_dates_reads_nested_keys_and_records():
+    payload = {"data": {"available_dates": ["2026-11-01"], "days": [
+        {"date": "2026-11-02", "available": True},
+        {"date": "2026-11-03", "available": False},
+        {"date": "2026-11-04", "count": 2},
+    ]}}
+    assert availability_probe.open_dates(payload) == {"2026-11-01", "2026-11-02", "2026-11-04"}
+
+
+def test_standin_endpoint_reports_only_open_days():
+    with StandInSite(available_days=[15, 16]) as site:
+        session = "test-session"
+        site.sessions.add(session)
+        month = site.month.strftime("%Y-%m")
+        request = Request(site.url(f"/api/availability?month={month}"), headers={"Cookie": f"session={session}"})
+        with urlopen(request, timeout=5) as response:
+            payload = json.load(response)
+    assert f"{month}-01" in payload["unavailable"]
+    assert availability_probe.open_dates(payload) == {f"{month}-15", f"{month}-16"}
@@ -0,0 +1,133 @@
+"""Span-based tracing of reservation steps with Chrome trace-event export.
+
+Spans nest per thread (so the Streamlit background thread traces cleanly
+alongside anything else) and are exported as Chrome trace-event JSON, which
+opens in chrome://tracing or https://ui.perfetto.dev as a timeline.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Tracer:
+    """Collects complete ('X') trace events for nested spans"""
+
+    def __init__(self, process_name="ParkingBot", on_step=None):
+        self.process_name = process_name
+        # Called with the innermost step name whenever a step span starts or ends
+        self.on_step = on_step
+        self.pid = os.getpid()
+        self.events = []
+        self._origin = time.perf_counter()
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+            with self._lock:
+                self._threads[threading.get_ident()] = threading.current_thread().name
+        return self._local.stack
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _push(self, name, cat, args, phase=False):
+        entry = {"name": name, "cat": cat, "args": args, "start": self._now(), "phase": phase}
+        self._stack().append(entry)
+        return entry
+
+    def _pop(self, entry):
+        stack = self._stack()
+        # Close any phases still open inside this span first
+        while stack and stack[-1] is not entry:
+            self._finish(stack.pop())
+        if stack:
+            stack.pop()
+        self._finish(entry)
+
+    def _finish(self, entry):
+        event = {
+            "name": entry["name"],
+            "cat": entry["cat"],
+            "ph": "X",
+            "ts": round(entry["start"], 1),
+            "dur": round(self._now() - entry["start"], 1),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": entry["args"],
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat="step", **args):
+        """Time the enclosed block as a span nested under the current one"""
+        entry = self._push(name, cat, args)
+        if cat == "step" and self.on_step:
+            self.on_step(name)
+        try:
+            yield entry
+        except Exception as e:
+            entry["args"]["error"] = str(e)
+            raise
+        finally:
+            self._pop(entry)
+            if cat == "step" and self.on_step:
+                self.on_step(self.current_step())
+
+    def phase(self, name, **args):
+        """End the current phase of the enclosing span (if any) and start the next one"""
+        stack = self._stack()
+        if stack and stack[-1]["phase"]:
+            self._finish(stack.pop())
+        self._push(name, "phase", args, phase=True)
+
+    def instant(self, name, **args):
+        with self._lock:
+            self.events.append({
+                "name": name, "cat": "event", "ph": "i", "s": "t", "ts": round(self._now(), 1),
+                "pid": self.pid, "tid": threading.get_ident(), "args": args,
+            })
+
+    def current_step(self):
+        """Name of the innermost 'step' span on the calling thread, or None"""
+        for entry in reversed(getattr(self._local, "stack", [])):
+            if entry["cat"] == "step":
+                return entry["name"]
+        return None
+
+    def export(self, path):
+        """Write the collected events as Chrome trace-event JSON and return the path"""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.process_name}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def export_to_dir(self, directory, prefix="reservation"):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return self.export(os.path.join(directory, f"{prefix}-{stamp}.json"))
+
+
+def traced(name=None, cat="step"):
+    """Method decorator: run the method inside a span on self.tracer"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name or method.__name__, cat):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,66 @@
+"""Condition-driven waits with a per-step latency budget.
+
+Each reservation step gets a maximum number of seconds it may spend waiting
+for page post-conditions (URL changes, elements appearing).  Waits return as
+soon as their condition holds, and the time actually spent waiting is
+recorded per step so runs can report where the idle time went.
+"""
+import time
+from contextlib import nullcontext
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_STEP_BUDGETS = {
+    "login": 20,
+    "navigate_to_calendar": 20,
+    "select_date": 20,
+    "select_carpool": 20,
+    "checkout": 20,
+    "confirm_reservation": 30,
+}
+
+
+class StepWaits:
+    """Budgeted WebDriver waits, keyed by reservation step"""
+
+    def __init__(self, driver, budgets=None, poll_frequency=0.1, tracer=None):
+        self.driver = driver
+        self.tracer = tracer
+        self.budgets = dict(DEFAULT_STEP_BUDGETS, **(budgets or {}))
+        self.poll_frequency = poll_frequency
+        self.spent = {}
+        self._used = {}
+
+    def begin(self, step):
+        """Start a fresh budget for step (its reported total keeps accumulating)"""
+        self._used[step] = 0.0
+
+    def remaining(self, step):
+        return max(self.budgets[step] - self._used.get(step, 0.0), 0.0)
+
+    def until(self, step, condition, message="", cap=None):
+        """Wait for condition using what is left of step's budget (at most cap seconds) and return its value"""
+        timeout = self.remaining(step)
+        if cap is not None:
+            timeout = min(timeout, cap)
+        # expected_conditions return closures; name the wait after the factory that built them
+        qualname = getattr(condition, "__qualname__", type(condition).__name__)
+        label = qualname.split(".<locals>")[0].rsplit(".", 1)[-1]
+        span = self.tracer.span(f"wait {label}", "wait", step=step) if self.tracer else nullcontext()
+        start = time.perf_counter()
+        try:
+            with span:
+                return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(
+                    condition, message or f"{step} budget of {self.budgets[step]}s exhausted"
+                )
+        finally:
+            elapsed = time.perf_counter() - start
+            self._used[step] = self._used.get(step, 0.0) + elapsed
+            self.spent[step] = self.spent.get(step, 0.0) + elapsed
+
+    def report(self):
+        """Seconds spent waiting per step, in flow order"""
+        return {step: round(self.spent[step], 3) for step in self.budgets if step in self.spent}
+
+    def summary(self):
+        return ", ".join(f"{step} {seconds:.2f}s" for step, seconds in self.report().items())